@@ -4,7 +4,7 @@ import datetime
 from ..scheduling import dto as scheduling_dto  # noqa: TID252
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ClusterTemplate:
     """
     Represents a template for Kubernetes clusters.
@@ -34,7 +34,7 @@ class ClusterTemplate:
     created_at: datetime.datetime
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class NodeGroup:
     """
     Represents a node group in a cluster.
@@ -54,7 +54,7 @@ class NodeGroup:
     max_count: int | None
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class Node:
     """
     Represents a node in the cluster.
@@ -78,7 +78,7 @@ class Node:
     created_at: datetime.datetime
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class Addon:
     """
     Represents an addon in the cluster.
@@ -90,7 +90,7 @@ class Addon:
     status: str
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class Service:
     """
     Represents a service available on a cluster or app.
@@ -106,7 +106,7 @@ class Service:
     icon_url: str | None
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class Cluster:
     """
     Represents a Kubernetes cluster.
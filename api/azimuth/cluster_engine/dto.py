@@ -18,7 +18,7 @@ from ..provider import dto as cloud_dto  # noqa: TID252
 from ..scheduling import dto as scheduling_dto  # noqa: TID252
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Context:
     """
     Represents a context for an operation.
@@ -35,7 +35,7 @@ class Context:
     credential: cloud_dto.Credential | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ClusterParameter:
     """
     Represents a parameter required by a cluster type.
@@ -61,7 +61,7 @@ class ClusterParameter:
     hidden: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ClusterServiceSpec:
     """
     Represents a Zenith service exposed by a cluster type (when apps are enabled).
@@ -79,7 +79,7 @@ class ClusterServiceSpec:
     internal: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ClusterType:
     """
     Represents a cluster type.
@@ -203,7 +203,7 @@ class ClusterStatus(enum.Enum):
     ERROR = "ERROR"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ClusterService:
     """
     Represents a Zenith service for a cluster.
@@ -221,7 +221,7 @@ class ClusterService:
     subdomain: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Cluster:
     """
     Represents a cluster.
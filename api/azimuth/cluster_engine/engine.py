@@ -2,6 +2,9 @@
 This module defines the base class for cluster managers.
 """
 
+# Postpone evaluation of annotations to prevent circular dependencies
+from __future__ import annotations
+
 import dataclasses
 import typing as t
 
@@ -35,9 +38,7 @@ class Engine:
         self._driver = driver
         self._zenith = zenith
 
-    def create_manager(
-        self, cloud_session: cloud_base.ScopedSession
-    ) -> "ClusterManager":
+    def create_manager(self, cloud_session: cloud_base.ScopedSession) -> ClusterManager:
         """
         Creates a cluster manager for the given tenancy-scoped cloud session.
         """
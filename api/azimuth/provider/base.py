@@ -140,11 +140,18 @@ class UnscopedSession:
         return True
 
     def _scoped_session(
-        self, auth_user: auth_dto.User, tenancy: dto.Tenancy, credential_data: str
+        self,
+        auth_user: auth_dto.User,
+        tenancy: dto.Tenancy,
+        credential_data: str,
+        token_data: Mapping[str, Any] | None = None,
     ) -> "ScopedSession":
         """
         Private method that creates a scoped session for the given tenancy.
 
+        If the auth session has already validated the token in the credential, the
+        token data is also given.
+
         This method should be overridden in subclasses to create scoped sessions.
         Subclasses can assume that the parent class will handle error conditions.
         """
@@ -171,13 +178,17 @@ class UnscopedSession:
             # If the auth session is unable to supply a credential, bail
             if credential:
                 credential_data = credential.data
+                token_data = credential.token_data
             else:
                 msg = f"no credentials available for {self.provider_name} provider"
                 raise errors.InvalidOperationError(msg)
         else:
             # If the provider does not require a credential, just pass empty data
             credential_data = ""
-        return self._scoped_session(self.auth_user, tenancy, credential_data)
+            token_data = None
+        return self._scoped_session(
+            self.auth_user, tenancy, credential_data, token_data
+        )
 
     def close(self):
         """
@@ -315,6 +326,36 @@ class ScopedSession:
             f"Operation not supported for provider '{self.provider_name}'"
         )
 
+    def tail_logs_for_machine(
+        self,
+        machine: dto.Machine | str,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> dto.MachineLogs:
+        """
+        Returns the tail of the log for the given machine.
+
+        If an offset from a previous call is given, only the lines that follow the
+        lines returned by that call are returned. If the lines cannot follow on from
+        the offset, e.g. because the log has been truncated, the tail of the log is
+        returned instead and ``reset`` is set.
+
+        At most ``limit`` lines are returned, if given.
+
+        The default implementation fetches the whole log and discards the lines that
+        are not required. Providers should override this if they are able to fetch
+        only the tail of the log.
+        """
+        lines = list(self.fetch_logs_for_machine(machine))
+        if offset is not None and 0 <= offset <= len(lines):
+            new_lines, reset = lines[offset:], False
+        else:
+            new_lines, reset = lines, True
+        if limit and len(new_lines) > limit:
+            # If lines are dropped, the lines no longer follow on from the offset
+            new_lines, reset = new_lines[-limit:], True
+        return dto.MachineLogs(new_lines, len(lines), reset)
+
     def create_machine(
         self,
         name: str,
@@ -373,6 +414,35 @@ class ScopedSession:
             f"Operation not supported for provider '{self.provider_name}'"
         )
 
+    def bulk_machine_action(
+        self, action: dto.MachineAction, machines: Iterable[dto.Machine | str]
+    ) -> Iterable[dto.MachineActionResult]:
+        """
+        Performs the given action on each of the specified machines.
+
+        A result is returned for each machine, in the same order as the machines. A
+        failure for one machine does not prevent the action being performed on the
+        other machines.
+
+        The default implementation performs the action on each machine in turn.
+        Providers should override this if they are able to do better.
+        """
+        method = {
+            dto.MachineAction.START: self.start_machine,
+            dto.MachineAction.STOP: self.stop_machine,
+            dto.MachineAction.RESTART: self.restart_machine,
+            dto.MachineAction.DELETE: self.delete_machine,
+        }[action]
+        results = []
+        for machine in machines:
+            machine_id = machine.id if isinstance(machine, dto.Machine) else machine
+            try:
+                result = dto.MachineActionResult(machine_id, method(machine_id))
+            except errors.Error as exc:
+                result = dto.MachineActionResult(machine_id, None, exc)
+            results.append(result)
+        return results
+
     def fetch_firewall_rules_for_machine(
         self, machine: dto.Machine | str
     ) -> Iterable[dto.FirewallGroup]:
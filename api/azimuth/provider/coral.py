@@ -0,0 +1,99 @@
+"""
+Module containing a client for the Coral credits API.
+"""
+
+import uuid
+
+import requests
+
+
+class Client:
+    """
+    Client for the Coral credits API.
+
+    The client uses a single requests session, so connections to Coral are pooled,
+    and applies a timeout to every request.
+
+    If a cache is given, the resource provider accounts for each project and the
+    allocations for each account are cached for the TTLs of the ``coral.accounts``
+    and ``coral.allocations`` kinds respectively. The cache must have the same
+    interface as :py:class:`.openstack.cache.Cache`.
+
+    Args:
+        base_url: The base URL of the Coral API.
+        token: The token to use to authenticate with Coral.
+        timeout: The timeout in seconds for requests to Coral.
+        session: The requests session to use. If not given, a new session is created.
+        cache: The cache to use for accounts and allocations.
+    """
+
+    def __init__(self, base_url, token, timeout=10, session=None, cache=None):
+        self._base_url = base_url.rstrip("/")
+        self._timeout = timeout
+        self._session = session or requests.Session()
+        self._session.headers["Authorization"] = f"Bearer {token}"
+        self._cache = cache
+
+    def _get(self, path, **params):
+        response = self._session.get(
+            f"{self._base_url}{path}", params=params, timeout=self._timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _cached(self, scope, kind, func):
+        """
+        Returns the cached value for the scope and kind, calling the function to
+        produce the value if it is not cached.
+        """
+        if not self._cache:
+            return func()
+        value = self._cache.get(scope, kind)
+        if value is None:
+            value = func()
+            self._cache.set(scope, kind, value)
+        return value
+
+    def accounts(self, project_id):
+        """
+        Returns the resource provider accounts for the given OpenStack project.
+        """
+
+        def fetch():
+            # Coral stores the project ID with dashes, so ask for that if we can
+            # Filtering is repeated locally in case the server does not support it
+            try:
+                params = {"project_id": str(uuid.UUID(project_id))}
+            except ValueError:
+                params = {}
+            return [
+                account
+                for account in self._get("/resource_provider_account", **params)
+                if account["project_id"].replace("-", "") == project_id.replace("-", "")
+            ]
+
+        return self._cached(project_id, "coral.accounts", fetch)
+
+    def allocations(self, account):
+        """
+        Returns the allocations for the given account.
+        """
+
+        def fetch():
+            # Filtering is repeated locally in case the server does not support it
+            return [
+                allocation
+                for allocation in self._get("/allocation", account=account)
+                if allocation["account"] == account
+            ]
+
+        return self._cached(account, "coral.allocations", fetch)
+
+    def allocation_resources(self, allocation_id):
+        """
+        Returns the resources for the given allocation, including the remaining
+        resource hours.
+
+        These are never cached, as they change as credits are consumed.
+        """
+        return self._get(f"/allocation/{allocation_id}/resources")
@@ -8,7 +8,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Capabilities:
     """
     Represents the capabilities of the cloud.
@@ -27,7 +27,7 @@ class Capabilities:
     supports_apps: bool = True
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Tenancy:
     """
     Represents a tenancy/organisation on a cloud provider.
@@ -39,7 +39,7 @@ class Tenancy:
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Credential:
     """
     Represents a credential for interacting with a cloud.
@@ -62,7 +62,7 @@ class QuotaType(enum.Enum):
     NETWORK = "NETWORK"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Quota:
     """
     Represents a quota available to a tenancy.
@@ -85,7 +85,7 @@ class Quota:
     related_resource_names: list = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Image:
     """
     Represents an image available to a tenancy.
@@ -105,7 +105,7 @@ class Image:
     metadata: Mapping[str, str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Size:
     """
     Represents a machine size available to a tenancy.
@@ -148,7 +148,7 @@ class MachineStatusType(enum.Enum):
     OTHER = "OTHER"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MachineStatus:
     """
     Represents a machine status.
@@ -162,7 +162,7 @@ class MachineStatus:
     details: str | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Machine:
     """
     Represents a machine in a tenancy.
@@ -196,6 +196,48 @@ class Machine:
     created: datetime
 
 
+@dataclass(frozen=True, slots=True)
+class MachineLogs:
+    """
+    Represents the tail of the log for a machine.
+    """
+
+    #: The log lines
+    lines: Sequence[str]
+    #: The offset to pass to fetch only the lines that follow these lines
+    offset: int
+    #: Indicates if the lines replace any lines that were previously fetched, rather
+    #: than following on from the lines fetched using the given offset
+    reset: bool
+
+
+@enum.unique
+class MachineAction(enum.Enum):
+    """
+    Enum representing the actions that can be performed on several machines at once.
+    """
+
+    START = "START"
+    STOP = "STOP"
+    RESTART = "RESTART"
+    DELETE = "DELETE"
+
+
+@dataclass(frozen=True, slots=True)
+class MachineActionResult:
+    """
+    Represents the result of performing an action on one of several machines.
+    """
+
+    #: The id of the machine
+    machine_id: str
+    #: The machine after the action was performed, or None if the machine no longer
+    #: exists or the action failed
+    machine: Machine | None
+    #: The error that occurred while performing the action, if any
+    error: Exception | None = None
+
+
 class FirewallRuleDirection(enum.Enum):
     """
     Enum representing the possible directions for a firewall rule.
@@ -226,7 +268,7 @@ class FirewallRuleProtocol(enum.Enum):
         return self in {self.__class__.UDP, self.__class__.TCP}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FirewallRule:
     """
     Represents a firewall rule applying to a host.
@@ -246,7 +288,7 @@ class FirewallRule:
     remote_group: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FirewallGroup:
     """
     Represents a group in the firewall.
@@ -280,7 +322,7 @@ class VolumeStatus(enum.Enum):
     OTHER = "OTHER"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Volume:
     """
     Represents a volume attached to a machine.
@@ -301,7 +343,7 @@ class Volume:
     device: str | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ExternalIp:
     """
     Represents an externally visible IP address.
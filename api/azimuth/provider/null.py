@@ -23,7 +23,7 @@ class UnscopedSession(base.UnscopedSession):
         # The null provider does not require a credential
         return False
 
-    def _scoped_session(self, auth_user, tenancy, credential_data):
+    def _scoped_session(self, auth_user, tenancy, credential_data, token_data=None):
         return ScopedSession(auth_user, tenancy)
 
 
@@ -10,3 +10,4 @@ from . import (
     share,  # noqa: F401
 )
 from .core import Connection, ServiceNotSupported  # noqa: F401
+from .transport import Transport  # noqa: F401
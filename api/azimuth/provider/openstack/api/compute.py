@@ -72,6 +72,8 @@ class Server(ResourceWithDetail):
 
     class Meta:
         endpoint = "/servers"
+        # Lists can be very large, so are prefetched and streamed if enabled
+        page_size = 1000
         aliases = dict(  # noqa: RUF012
             image_id="imageRef",
             flavor_id="flavorRef",
@@ -83,9 +85,10 @@ class Server(ResourceWithDetail):
 
     volume_attachments = NestedResource(VolumeAttachment)
 
-    def logs(self):
+    def logs(self, length=None):
         endpoint = self._manager.prepare_url(self, "action")
-        params = {"os-getConsoleOutput": {}}
+        # If a length is given, only that many lines from the end of the log are sent
+        params = {"os-getConsoleOutput": {"length": length} if length else {}}
         response = self._manager.connection.api_post(endpoint, json=params)
         return response.json()["output"]
 
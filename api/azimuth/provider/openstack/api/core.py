@@ -2,13 +2,19 @@
 Module containing helpers for interacting with the OpenStack API.
 """
 
+import datetime
+import functools
+import hashlib
 import json
 import logging
 from urllib.parse import urlsplit
 
+import dateutil.parser
 import rackit
 import requests
 
+from .streaming import ListDecoder
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,6 +59,58 @@ class ResourceManager(rackit.ResourceManager):
         else:
             raise RuntimeError("Unable to locate manager for embedded resource")
 
+    def _fetch_all(self, endpoint, params, partial=False):
+        # Page prefetching and streaming are only used for resources with a page size,
+        # which are the ones that can have very large lists
+        auth = self.connection.session.auth
+        page_size = getattr(self.resource_cls._opts, "page_size", None)
+        if not page_size or not (auth.page_executor or auth.stream_lists):
+            yield from super()._fetch_all(endpoint, params, partial)
+            return
+        params = {"limit": page_size, **params}
+        next_page = self._get_page(endpoint, params)
+        while next_page:
+            response = next_page()
+            if auth.stream_lists:
+                # Decode the items incrementally as they are consumed
+                # The next URL can only be extracted once all the items are consumed
+                try:
+                    items = ListDecoder.from_response(
+                        response, self.resource_cls._opts.resource_list_key
+                    )
+                    for item in items:
+                        yield self.make_instance(item, partial)
+                finally:
+                    response.close()
+                next_url, next_params = self.extract_next_url(items.extra), {}
+                next_page = self._get_page(next_url, next_params) if next_url else None
+            else:
+                # If prefetching, the next page is fetched while the items from this
+                # page are consumed
+                data, next_url, next_params = self.extract_list(response)
+                next_page = self._get_page(next_url, next_params) if next_url else None
+                for item in data:
+                    yield self.make_instance(item, partial)
+
+    def _get_page(self, url, params):
+        """
+        Starts fetching a page of a list and returns a function that returns the
+        response.
+
+        If the connection has an executor for prefetching pages, the page is fetched
+        in the background. Otherwise it is fetched when the function is called.
+        """
+        auth = self.connection.session.auth
+        kwargs = dict(params=params)
+        # When streaming, the body is only read as the items are consumed
+        if auth.stream_lists:
+            kwargs.update(stream=True)
+        if auth.page_executor:
+            future = auth.page_executor.submit(self.connection.api_get, url, **kwargs)
+            return future.result
+        else:
+            return functools.partial(self.connection.api_get, url, **kwargs)
+
     def extract_list(self, response):
         # OpenStack responses have the list under a named key
         # If there is a next page, that is provided under a links attribute
@@ -218,6 +276,9 @@ class Connection(rackit.Connection):
         project_name,
         roles,
         endpoints,
+        transport=None,
+        page_executor=None,
+        stream_lists=False,
     ):
         # Store the given parameters, as it is sometimes useful to be able to query them
         # later
@@ -235,13 +296,47 @@ class Connection(rackit.Connection):
         self.project_name = project_name
         self.roles = roles
         self.endpoints = endpoints
+        # The executor used to prefetch pages for paginated lists, if enabled
+        self.page_executor = page_executor
+        # Indicates whether to decode large lists incrementally
+        self.stream_lists = stream_lists
+        self.transport = transport
         # This object is the auth object for the session
-        session = requests.Session()
-        session.auth = self
-        session.verify = self.verify
+        # If a transport is given, the session uses the shared connection pools
+        if transport:
+            session = transport.session(self, self.verify)
+        else:
+            session = requests.Session()
+            session.auth = self
+            session.verify = self.verify
         # Once the superclass init is called, we can use the api_{} methods
         super().__init__(auth_url, session)
 
+    def clone(self):
+        """
+        Returns a new connection with the same token and parameters as this one but
+        its own session, so that it can be used after this connection is closed.
+        """
+        return type(self)(
+            self.auth_url,
+            self.token,
+            self.region,
+            self.interface,
+            self.verify,
+            self.auth_method,
+            self.user_id,
+            self.username,
+            self.domain_id,
+            self.domain_name,
+            self.project_id,
+            self.project_name,
+            self.roles,
+            self.endpoints,
+            transport=self.transport,
+            page_executor=self.page_executor,
+            stream_lists=self.stream_lists,
+        )
+
     def __call__(self, request):
         # This is what allows the connection to be used as a requests auth
         # If there is a token, set the OpenStack auth token header
@@ -251,10 +346,73 @@ class Connection(rackit.Connection):
             pass
         return request
 
+    @staticmethod
+    def _params_from_token_data(token_data, interface, region):
+        """
+        Returns the connection parameters derived from the given token data, including
+        the endpoints from the service catalog.
+        """
+        # Extract the endpoints from the catalog for the correct interface and region
+        endpoints = {}
+        for entry in token_data["catalog"]:
+            try:
+                endpoint = next(
+                    ep["url"]
+                    for ep in entry["endpoints"]
+                    # If no region is given, use the first one that we find
+                    if (
+                        ep["interface"] == interface
+                        and (not region or ep["region"] == region)
+                    )
+                )
+            except StopIteration:
+                continue
+            # Strip any path component from the endpoint
+            endpoints[entry["type"]] = urlsplit(endpoint)._replace(path="").geturl()
+        return dict(
+            auth_method=token_data["methods"][0],
+            user_id=token_data["user"]["id"],
+            username=token_data["user"]["name"],
+            domain_id=token_data["user"]["domain"]["id"],
+            domain_name=token_data["user"]["domain"]["name"],
+            project_id=token_data["project"]["id"],
+            project_name=token_data["project"]["name"],
+            roles=token_data["roles"],
+            endpoints=endpoints,
+        )
+
     @classmethod
-    def from_clouds(cls, data):
+    def from_token_data(
+        cls,
+        auth_url,
+        token,
+        token_data,
+        region=None,
+        interface="public",
+        verify=True,
+        **kwargs,
+    ):
+        """
+        Initialise a connection using a project-scoped token and the token data
+        returned by Keystone when the token was issued or validated.
+
+        Any additional keyword arguments are passed to the connection.
+        """
+        params = cls._params_from_token_data(token_data, interface, region)
+        return cls(auth_url, token, region, interface, verify, **params, **kwargs)
+
+    @classmethod
+    def from_clouds(cls, data, cache=None, token_data=None, **kwargs):
         """
         Initialise a connection using data from a clouds.yaml file.
+
+        If the data for a v3token has already been retrieved, e.g. by the auth session
+        that produced the clouds.yaml, it can be given to avoid looking it up again.
+        Otherwise, if a cache is given, the parameters derived from the service catalog
+        for a token are cached so that the token does not need to be looked up again.
+
+        Any additional keyword arguments are passed to the connection. If a transport
+        is given, it is also used for the requests to Keystone made here.
         """
         # Use the first cloud that we find in the clouds data
         cloud_data = next(iter(data["clouds"].values()))
@@ -265,20 +423,43 @@ class Connection(rackit.Connection):
         region = cloud_data.get("region_name")
         interface = cloud_data.get("interface", "public")
         verify = cloud_data.get("verify", True)
+        transport = kwargs.get("transport")
+        http = transport.session(verify=verify) if transport else requests
         # Get a token and the token information from the credential
         if cloud_data["auth_type"] == "v3token":
             # If we already have a token, assume it is scoped for the target project
-            # We just retrieve the token information, including the service catalog
             token = cloud_data["auth"]["token"]
-            response = requests.get(
+            if token_data:
+                return cls.from_token_data(
+                    auth_url, token, token_data, region, interface, verify, **kwargs
+                )
+            # See if we have already looked up the token information
+            cache_scope = hashlib.sha256(token.encode()).hexdigest()
+            params = cache.get(cache_scope, "catalog") if cache else None
+            if params:
+                return cls(
+                    auth_url, token, region, interface, verify, **params, **kwargs
+                )
+            # We just retrieve the token information, including the service catalog
+            response = http.get(
                 f"{auth_url}/auth/tokens",
                 headers={"X-Auth-Token": token, "X-Subject-Token": token},
                 verify=verify,
             )
             response.raise_for_status()
             token_data = response.json()["token"]
+            params = cls._params_from_token_data(token_data, interface, region)
+            if cache:
+                # Never cache the parameters beyond the expiry of the token
+                expires_at = dateutil.parser.isoparse(token_data["expires_at"])
+                now = datetime.datetime.now(datetime.timezone.utc)
+                remaining = int((expires_at - now).total_seconds())
+                cache.set(
+                    cache_scope, "catalog", params, min(cache.ttl("catalog"), remaining)
+                )
+            return cls(auth_url, token, region, interface, verify, **params, **kwargs)
         elif cloud_data["auth_type"] == "v3applicationcredential":
-            response = requests.post(
+            response = http.post(
                 f"{auth_url}/auth/tokens",
                 json={
                     "auth": {
@@ -296,44 +477,17 @@ class Connection(rackit.Connection):
                 verify=verify,
             )
             response.raise_for_status()
-            token = response.headers["X-Subject-Token"]
-            token_data = response.json()["token"]
+            return cls.from_token_data(
+                auth_url,
+                response.headers["X-Subject-Token"],
+                response.json()["token"],
+                region,
+                interface,
+                verify,
+                **kwargs,
+            )
         else:
             raise UnsupportedAuthType(cloud_data["auth_type"])
-        # Extract the endpoints from the catalog for the correct interface and region
-        endpoints = {}
-        for entry in token_data["catalog"]:
-            try:
-                endpoint = next(
-                    ep["url"]
-                    for ep in entry["endpoints"]
-                    # If no region is given, use the first one that we find
-                    if (
-                        ep["interface"] == interface
-                        and (not region or ep["region"] == region)
-                    )
-                )
-            except StopIteration:
-                continue
-            # Strip any path component from the endpoint
-            endpoints[entry["type"]] = urlsplit(endpoint)._replace(path="").geturl()
-        # Create and return the connection
-        return cls(
-            auth_url,
-            token,
-            region,
-            interface,
-            verify,
-            token_data["methods"][0],
-            token_data["user"]["id"],
-            token_data["user"]["name"],
-            token_data["user"]["domain"]["id"],
-            token_data["user"]["domain"]["name"],
-            token_data["project"]["id"],
-            token_data["project"]["name"],
-            token_data["roles"],
-            endpoints,
-        )
 
 
 class ServiceNotSupported(RuntimeError):  # noqa: N818
@@ -24,6 +24,8 @@ class Image(Resource):
     class Meta:
         manager_cls = ImageManager
         endpoint = "/images"
+        # Lists can be very large, so are prefetched and streamed if enabled
+        page_size = 1000
         # The image service returns the image data directly when fetching by id
         resource_key = None
 
@@ -26,21 +26,41 @@ class Quotas(UnmanagedResource):
         )
 
 
+class QuotaDetails(Quotas):
+    """
+    Represents the quotas for a project, including the current usage.
+
+    Each quota is a dictionary with ``limit``, ``used`` and ``reserved`` keys.
+    This requires the ``quota_details`` extension.
+    """
+
+    class Meta:
+        endpoint = "/quotas/{project_id}/details"
+        resource_key = "quota"
+
+
 class NetworkResourceManager(ResourceManager):
     """
     Custom resource manager for networking resources.
 
     Handles scoping list queries to the current project unless specifically
     asked not to by specifying ``project_id = None``.
+
+    Also allows the fields returned by list queries to be restricted by specifying
+    ``fields``, in which case partial resources are returned.
     """
 
-    def all(self, **params):
+    def all(self, fields=None, **params):
         try:
             project_id = params.pop("project_id")
         except KeyError:
             project_id = self.connection.session.auth.project_id
         if project_id:
             params.update(project_id=project_id)
+        if fields:
+            # Always include the id so that partial resources can be loaded in full
+            params.update(fields=list(dict.fromkeys(["id", *fields])))
+            return self._fetch_all(self.prepare_url(), params, True)
         return super().all(**params)
 
 
@@ -60,6 +80,8 @@ class FloatingIp(NetworkResource):
 
     class Meta:
         endpoint = "/floatingips"
+        # Lists can be very large, so are prefetched and streamed if enabled
+        page_size = 1000
 
 
 class Port(NetworkResource):
@@ -69,6 +91,8 @@ class Port(NetworkResource):
 
     class Meta:
         endpoint = "/ports"
+        # Lists can be very large, so are prefetched and streamed if enabled
+        page_size = 1000
 
 
 class Network(NetworkResource):
@@ -145,6 +169,7 @@ class NetworkService(Service):
     error_keys = ("NeutronError", "message")
 
     quotas = Endpoint(Quotas)
+    quota_details = Endpoint(QuotaDetails)
     floatingips = RootResource(FloatingIp)
     ports = RootResource(Port)
     networks = RootResource(Network)
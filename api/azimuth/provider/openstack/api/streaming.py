@@ -0,0 +1,142 @@
+"""
+Module containing helpers for decoding large OpenStack list responses incrementally.
+"""
+
+import codecs
+import json
+
+#: The size of the chunks to read from the response body
+CHUNK_SIZE = 64 * 1024
+
+
+class ListDecoder:
+    """
+    Decodes the items of a list in a JSON object response body incrementally, so that
+    the whole body never needs to be held in memory at once.
+
+    Iterating over the decoder yields the items of the list under ``list_key``. Once
+    the items have been consumed, the other keys of the object are available as
+    ``extra``, e.g. so that the link to the next page can be extracted.
+
+    Args:
+        chunks: An iterable of byte chunks making up the response body.
+        list_key: The key of the list within the top-level object.
+    """
+
+    def __init__(self, chunks, list_key):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._list_key = list_key
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        #: The keys of the top-level object other than the list
+        self.extra = {}
+
+    @classmethod
+    def from_response(cls, response, list_key):
+        """
+        Returns a decoder for the body of the given streamed response.
+        """
+        return cls(response.iter_content(CHUNK_SIZE), list_key)
+
+    def _read(self):
+        """
+        Reads the next chunk into the buffer, returning False if there are no more.
+        """
+        if self._eof:
+            return False
+        # Discard the part of the buffer that has already been decoded
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            self._buffer += self._decoder.decode(b"", final=True)
+        else:
+            self._buffer += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self):
+        """
+        Skips any whitespace and returns the next character without consuming it.
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                raise ValueError("Unexpected end of JSON response")
+
+    def _expect(self, *chars):
+        """
+        Consumes the next character, which must be one of the given characters.
+        """
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars} at {self._pos}, got '{char}'")
+        self._pos += 1
+        return char
+
+    def _expect_end(self):
+        """
+        Checks that there is nothing but whitespace left in the body.
+        """
+        while True:
+            rest = self._buffer[self._pos :]
+            if rest.strip():
+                raise ValueError(f"Unexpected data after JSON object at {self._pos}")
+            self._pos = len(self._buffer)
+            if not self._read():
+                return
+
+    def _value(self):
+        """
+        Decodes and consumes the next complete JSON value.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Once the whole body has been read, the value is really invalid
+                if self._eof:
+                    raise
+            else:
+                # A value that ends at the end of the buffer may be truncated, e.g. a
+                # number, so only accept it if there is more data or the body is done
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            # Read until the buffer has doubled in size before trying again, so that
+            # large values are not decoded repeatedly
+            target = max(2 * (len(self._buffer) - self._pos), CHUNK_SIZE)
+            while len(self._buffer) - self._pos < target and self._read():
+                pass
+
+    def __iter__(self):
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            self._expect_end()
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == self._list_key:
+                self._expect("[")
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(",", "]") == "]":
+                            break
+            else:
+                self.extra[key] = self._value()
+            if self._expect(",", "}") == "}":
+                self._expect_end()
+                return
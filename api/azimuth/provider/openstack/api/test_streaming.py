@@ -0,0 +1,88 @@
+import json
+from unittest import TestCase
+
+from .streaming import ListDecoder
+
+ITEMS = [
+    {"id": "1", "name": "plain"},
+    {"id": "2", "name": 'escaped \\" quote and {braces} and [brackets]'},
+    {"id": "3", "name": "unicode ☃ and 𝄞", "size": 12345, "public": True},
+    {"id": "4", "tags": [], "metadata": {"nested": {"deep": None}}},
+]
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class ListDecoderTestCase(TestCase):
+    def decode(self, chunks, list_key="servers"):
+        decoder = ListDecoder(chunks, list_key)
+        return list(decoder), decoder.extra
+
+    def test_split_at_every_byte(self):
+        body = {
+            "servers": ITEMS,
+            "servers_links": [{"rel": "next", "href": "http://example.com/next"}],
+        }
+        data = json.dumps(body, ensure_ascii=False).encode()
+        for split in range(1, len(data)):
+            with self.subTest(split=split):
+                items, extra = self.decode([data[:split], data[split:]])
+                self.assertEqual(items, ITEMS)
+                self.assertEqual(extra, {"servers_links": body["servers_links"]})
+
+    def test_single_byte_chunks(self):
+        data = json.dumps({"servers": ITEMS}, ensure_ascii=False, indent=2).encode()
+        items, _ = self.decode(chunked(data, 1))
+        self.assertEqual(items, ITEMS)
+
+    def test_multibyte_utf8_split_across_chunks(self):
+        data = json.dumps({"servers": [{"name": "☃𝄞"}]}, ensure_ascii=False).encode()
+        start = data.index("☃".encode())
+        # Split inside each of the multi-byte characters
+        for split in range(start + 1, start + 7):
+            with self.subTest(split=split):
+                items, _ = self.decode([data[:split], data[split:]])
+                self.assertEqual(items, [{"name": "☃𝄞"}])
+
+    def test_numbers_split_across_chunks(self):
+        items, _ = self.decode([b'{"servers": [12', b"345, 6]}"])
+        self.assertEqual(items, [12345, 6])
+
+    def test_empty_list(self):
+        for data in [b'{"servers": []}', b'{ "servers" : [ ] , "other": 1 }']:
+            with self.subTest(data=data):
+                items, _ = self.decode(chunked(data, 3))
+                self.assertEqual(items, [])
+
+    def test_empty_object(self):
+        items, extra = self.decode([b"{}"])
+        self.assertEqual(items, [])
+        self.assertEqual(extra, {})
+
+    def test_keys_before_list(self):
+        items, extra = self.decode([b'{"count": 2, "servers": [1, 2]}'])
+        self.assertEqual(items, [1, 2])
+        self.assertEqual(extra, {"count": 2})
+
+    def test_truncated_body_raises(self):
+        data = json.dumps({"servers": ITEMS}).encode()
+        for end in range(len(data)):
+            with self.subTest(end=end):
+                with self.assertRaises(ValueError):
+                    self.decode(chunked(data[:end], 7))
+
+    def test_invalid_body_raises(self):
+        for data in [
+            b'["servers"]',
+            b'{"servers": [1 2]}',
+            b'{"servers": [1,]}',
+            b'{"servers": {"id": 1}}',
+            b'{"servers": [1]} trailing',
+            b'{"servers": [1]}{}',
+            b'{"servers": ["\xff"]}',
+        ]:
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    self.decode(chunked(data, 4))
@@ -0,0 +1,67 @@
+import http.server
+import threading
+from unittest import TestCase
+
+from .transport import Transport
+
+
+class FakeHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Request handler that returns a small body using a persistent connection.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        data = b"x" * 1024
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class TransportTestCase(TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeHandler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.transport = Transport(pool_maxsize=4)
+        self.addCleanup(self.transport.close)
+
+    def test_no_pools(self):
+        self.assertEqual(self.transport.metrics(), {})
+
+    def test_connections_are_shared_between_sessions(self):
+        for _ in range(3):
+            with self.transport.session() as session:
+                session.get(self.host).raise_for_status()
+        metrics = self.transport.metrics()
+        self.assertEqual(list(metrics), [self.host])
+        self.assertEqual(
+            metrics[self.host],
+            {
+                "maxsize": 4,
+                "in_use": 0,
+                "available": 4,
+                "connections_opened": 1,
+                "requests": 3,
+            },
+        )
+
+    def test_in_use_connections(self):
+        session = self.transport.session()
+        self.addCleanup(session.close)
+        # A streamed response holds on to its connection until it is closed
+        response = session.get(self.host, stream=True)
+        metrics = self.transport.metrics()[self.host]
+        self.assertEqual(metrics["in_use"], 1)
+        self.assertEqual(metrics["available"], 3)
+        response.close()
+        self.assertEqual(self.transport.metrics()[self.host]["in_use"], 0)
@@ -0,0 +1,143 @@
+"""
+Module containing the pooled HTTP transport shared by OpenStack connections.
+"""
+
+import socket
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter that can be shared between many sessions.
+
+    Closing a session that the adapter is mounted on does not close the adapter, so
+    the pooled connections survive the session.
+
+    The adapter keeps track of the connection pool that is used for each host, so
+    that metrics can be reported for the pools.
+    """
+
+    def __init__(self, *args, socket_options=None, **kwargs):
+        self._socket_options = socket_options
+        self._lock = threading.Lock()
+        # The pools are held weakly, so pools discarded by the pool manager disappear
+        self._pools = weakref.WeakValueDictionary()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._socket_options is not None:
+            kwargs.setdefault("socket_options", self._socket_options)
+        super().init_poolmanager(*args, **kwargs)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        pool = super().get_connection_with_tls_context(request, verify, proxies, cert)
+        url = urlsplit(request.url)
+        with self._lock:
+            self._pools[f"{url.scheme}://{url.netloc}"] = pool
+        return pool
+
+    def metrics(self):
+        """
+        Returns metrics for the connection pools, keyed by host.
+        """
+        with self._lock:
+            pools = dict(self._pools)
+        hosts = {}
+        for host, pool in sorted(pools.items()):
+            # Closed pools have no queue
+            queue = pool.pool
+            if queue is None:
+                continue
+            # The queue holds a slot for each connection that is not checked out,
+            # whether the connection has been opened yet or not
+            available = queue.qsize()
+            hosts[host] = {
+                "maxsize": queue.maxsize,
+                "in_use": max(queue.maxsize - available, 0),
+                "available": available,
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+            }
+        return hosts
+
+    def close(self):
+        # The adapter is closed when the owning transport is closed
+        pass
+
+    def shutdown(self):
+        """
+        Closes all the pooled connections.
+        """
+        super().close()
+
+
+class Transport:
+    """
+    Pooled HTTP transport that is shared by all the connections created by a provider.
+
+    Connections are pooled per endpoint host, with up to ``pool_maxsize`` connections
+    kept alive for each host. Authentication is not part of the transport and is still
+    applied per request by the connection.
+
+    Args:
+        pool_connections: The maximum number of hosts to keep connection pools for.
+        pool_maxsize: The maximum number of connections to keep alive for each host.
+        pool_block: If ``True``, requests block until a connection is available when
+                    the pool for a host is full rather than opening a new connection.
+        keepalive_idle: The number of seconds a pooled connection is idle before TCP
+                        keep-alive probes are sent. Use ``0`` to disable keep-alive
+                        probes.
+    """
+
+    def __init__(
+        self, pool_connections=10, pool_maxsize=10, pool_block=False, keepalive_idle=60
+    ):
+        socket_options = list(HTTPConnection.default_socket_options)
+        keepalive_idle = int(keepalive_idle)
+        if keepalive_idle > 0:
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            # TCP_KEEPIDLE is not available on all platforms
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                socket_options.append(
+                    (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive_idle)
+                )
+        self._adapter = SharedHTTPAdapter(
+            pool_connections=int(pool_connections),
+            pool_maxsize=int(pool_maxsize),
+            pool_block=pool_block,
+            socket_options=socket_options,
+        )
+
+    def session(self, auth=None, verify=True):
+        """
+        Returns a new requests session that uses the pooled connections.
+        """
+        session = requests.Session()
+        session.auth = auth
+        session.verify = verify
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
+        return session
+
+    def metrics(self):
+        """
+        Returns metrics for the connection pools, keyed by host.
+
+        For each host, this includes the maximum number of pooled connections, the
+        number of connections in use and the number of connections that are available
+        for reuse or can be opened without exceeding the maximum, along with the
+        number of connections opened and requests made using the pool.
+        """
+        return self._adapter.metrics()
+
+    def close(self):
+        """
+        Closes all the pooled connections.
+        """
+        self._adapter.shutdown()
@@ -0,0 +1,71 @@
+"""
+Module containing the cross-request cache used by the OpenStack provider.
+"""
+
+from django.core.cache import caches
+
+
+class Cache:
+    """
+    Cross-request cache for OpenStack resources that change infrequently.
+
+    Entries are scoped, usually by OpenStack project, and stored in the configured
+    Django cache, which means they are shared between all the sessions in a process and,
+    if a shared cache backend is configured, between processes.
+
+    Args:
+        alias: The alias of the Django cache to use (default ``default``).
+        key_prefix: The prefix for all keys stored by this cache.
+        ttls: Mapping of kind => TTL in seconds. A kind with a TTL of zero is never
+              cached.
+    """
+
+    def __init__(self, alias="default", key_prefix="azimuth.openstack", ttls=None):
+        self._alias = alias
+        self._key_prefix = key_prefix
+        self._ttls = dict(ttls or {})
+
+    @property
+    def _cache(self):
+        # Django cache instances are thread-local, so look it up every time
+        return caches[self._alias]
+
+    def _key(self, scope, kind):
+        return f"{self._key_prefix}:{scope}:{kind}"
+
+    def ttl(self, kind):
+        """
+        Returns the TTL for the given kind.
+        """
+        return self._ttls.get(kind, 0)
+
+    def enabled(self, kind):
+        """
+        Indicates whether caching is enabled for the given kind.
+        """
+        return self.ttl(kind) > 0
+
+    def get(self, scope, kind, default=None):
+        """
+        Returns the cached value of the given kind for the scope, e.g. a project ID, or
+        the default if there is no cached value.
+        """
+        if not self.enabled(kind):
+            return default
+        return self._cache.get(self._key(scope, kind), default)
+
+    def set(self, scope, kind, value, ttl=None):
+        """
+        Caches the value of the given kind for the scope.
+
+        If no TTL is given, the TTL for the kind is used.
+        """
+        ttl = self.ttl(kind) if ttl is None else ttl
+        if ttl > 0:
+            self._cache.set(self._key(scope, kind), value, ttl)
+
+    def invalidate(self, scope, *kinds):
+        """
+        Invalidates the cached values of the given kinds for the scope.
+        """
+        self._cache.delete_many([self._key(scope, kind) for kind in kinds])
@@ -3,6 +3,7 @@ This module contains the provider implementation for OpenStack.
 """
 
 import base64
+import concurrent.futures
 import dataclasses
 import datetime
 import functools
@@ -15,14 +16,14 @@ import time
 import certifi
 import dateutil.parser
 import rackit
-import requests
 import yaml
 from django.utils.timezone import make_aware
 
 from azimuth.settings import cloud_settings
 
-from .. import base, dto, errors  # noqa: TID252
+from .. import base, coral, dto, errors  # noqa: TID252
 from . import api
+from .cache import Cache
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,95 @@ class Lazy:
         return self.result
 
 
+@dataclasses.dataclass(frozen=True)
+class FlavorCatalogue:
+    """
+    The flavors available to a project, indexed for fast lookups.
+    """
+
+    #: The sizes for all the flavors, including disabled flavors, indexed by ID
+    sizes_by_id: dict[str, dto.Size]
+    #: The IDs of the flavors that are not disabled, in the order returned by the API
+    enabled_ids: tuple[str, ...]
+    #: The flavor IDs indexed by flavor name
+    ids_by_name: dict[str, str]
+
+    def sizes(self):
+        """
+        Returns the sizes for the flavors that are not disabled.
+        """
+        return tuple(self.sizes_by_id[size_id] for size_id in self.enabled_ids)
+
+    def find_by_id(self, id):  # noqa: A002
+        """
+        Returns the size with the given ID, or None if it does not exist.
+        """
+        return self.sizes_by_id.get(id)
+
+    def find_by_name(self, name):
+        """
+        Returns the size with the given name, or None if it does not exist.
+        """
+        size_id = self.ids_by_name.get(name)
+        return self.sizes_by_id[size_id] if size_id else None
+
+
+@dataclasses.dataclass(frozen=True)
+class ImageCatalogue:
+    """
+    The active images available to a project, indexed for fast lookups.
+    """
+
+    #: The images indexed by ID, in the order returned by the API
+    images_by_id: dict[str, dto.Image]
+    #: The most recent updated_at timestamp for the images in the catalogue
+    #: Used to fetch only the images that have changed when revalidating
+    updated_at: str | None
+    #: The time at which the full image list was fetched
+    fetched_at: float
+
+
+@dataclasses.dataclass(frozen=True)
+class NetworkRef:
+    """
+    Reference to a network discovered for a project.
+    """
+
+    #: The ID of the network
+    id: str
+    #: The name of the network
+    name: str
+
+
+@dataclasses.dataclass(frozen=True)
+class ShareRef:
+    """
+    Reference to the project share for a project.
+    """
+
+    #: The ID of the share
+    id: str
+    #: The name of the share
+    name: str
+    #: Indicates if the share is still being made available to the project user
+    pending: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class ServerInventory:
+    """
+    The machines in a project, maintained incrementally from the servers that change.
+    """
+
+    #: The machines indexed by ID, in the order returned by the API
+    machines_by_id: dict[str, dto.Machine]
+    #: The most recent updated timestamp for the servers in the inventory
+    #: Used to fetch only the servers that have changed when refreshing
+    updated_at: str | None
+    #: The time at which the full server list was fetched
+    fetched_at: float
+
+
 _REPLACEMENTS = [
     ("instance", "machine"),
     ("Instance", "Machine"),
@@ -154,6 +244,54 @@ class Provider(base.Provider):
         internal_net_dns_nameservers: The DNS nameservers for the internal network when
                                       it is auto-created (default ``None``).
         supports_machines: If True (the default), then users can manipulate machines
+        cache_alias: The alias of the Django cache used to cache OpenStack resources
+                     between requests (default ``default``).
+        flavor_cache_ttl: The number of seconds for which the flavor catalogue for a
+                          project is cached (default ``3600``). Use ``0`` to disable
+                          caching of flavors.
+        image_cache_ttl: The number of seconds for which the image catalogue for a
+                         project is cached before being fetched in full again
+                         (default ``600``). Use ``0`` to disable caching of images.
+        image_revalidate_interval: The number of seconds after which a cached image
+                                   catalogue is revalidated by fetching the images that
+                                   have changed (default ``30``). Use ``0`` to
+                                   revalidate on every request.
+        server_inventory_ttl: The number of seconds for which the server inventory for
+                              a project is cached before being fetched in full again
+                              (default ``300``). In between, only the servers that
+                              have changed are fetched. Use ``0`` to disable.
+        network_cache_ttl: The number of seconds for which the tenant, external and
+                           storage networks discovered for a project are cached
+                           (default ``300``). Use ``0`` to disable caching.
+        security_group_cache_ttl: The number of seconds for which the security groups
+                                  used to build machine firewall rules are cached
+                                  (default ``60``). Use ``0`` to disable caching.
+        project_share_cache_ttl: The number of seconds for which the validated project
+                                 share for a project is cached (default ``3600``).
+                                 Use ``0`` to check the share on every request.
+        catalog_cache_ttl: The maximum number of seconds for which the service catalog
+                           for a token is cached (default ``3600``). The service
+                           catalog is never cached beyond the expiry of the token.
+        console_log_cache_ttl: The number of seconds for which the position of the
+                               last console log lines returned for a machine is
+                               remembered (default ``600``). This allows subsequent
+                               requests to fetch only the lines that follow.
+        pool_connections: The maximum number of OpenStack API hosts to keep pooled HTTP
+                          connections for (default ``10``).
+        pool_maxsize: The maximum number of HTTP connections to keep alive for each
+                      OpenStack API host (default ``10``).
+        pool_keepalive_idle: The number of seconds a pooled HTTP connection is idle
+                             before TCP keep-alive probes are sent (default ``60``).
+                             Use ``0`` to disable keep-alive probes.
+        prefetch_pages: If ``True`` (the default is ``False``), large paginated lists,
+                        e.g. servers and images, are requested in larger pages and
+                        the next page is fetched while the current one is processed.
+        stream_lists: If ``True`` (the default is ``False``), large lists, e.g. servers
+                      and images, are decoded incrementally as the items are
+                      consumed rather than loading whole pages into memory.
+        max_workers: The number of threads in the pool used to make independent
+                     OpenStack API requests concurrently (default ``8``). The pool is
+                     shared by all the sessions created by the provider.
     """
 
     provider_name = "openstack"
@@ -169,6 +307,22 @@ class Provider(base.Provider):
         internal_net_cidr="192.168.3.0/24",
         internal_net_dns_nameservers=None,
         supports_machines=True,
+        cache_alias="default",
+        flavor_cache_ttl=3600,
+        image_cache_ttl=600,
+        image_revalidate_interval=30,
+        server_inventory_ttl=300,
+        network_cache_ttl=300,
+        security_group_cache_ttl=60,
+        project_share_cache_ttl=3600,
+        catalog_cache_ttl=3600,
+        console_log_cache_ttl=600,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_keepalive_idle=60,
+        prefetch_pages=False,
+        stream_lists=False,
+        max_workers=8,
     ):
         self._metadata_prefix = metadata_prefix
         self._internal_net_template = internal_net_template
@@ -181,6 +335,63 @@ class Provider(base.Provider):
         self._internal_net_cidr = internal_net_cidr
         self._internal_net_dns_nameservers = internal_net_dns_nameservers
         self._supports_machines = supports_machines
+        # The cache is shared by all the sessions created by this provider
+        self._cache = Cache(
+            cache_alias,
+            ttls={
+                "flavors": int(flavor_cache_ttl),
+                "images": int(image_cache_ttl),
+                "images.fresh": int(image_revalidate_interval),
+                "servers": int(server_inventory_ttl),
+                "networks": int(network_cache_ttl),
+                "secgroups": int(security_group_cache_ttl),
+                "share": int(project_share_cache_ttl),
+                "share.pending": ScopedSession._PROJECT_SHARE_READY_TIMEOUT,
+                "coral.accounts": int(cloud_settings.CORAL_CREDITS.CACHE_TTL),
+                "coral.allocations": int(cloud_settings.CORAL_CREDITS.CACHE_TTL),
+                "catalog": int(catalog_cache_ttl),
+                "logs": int(console_log_cache_ttl),
+            },
+        )
+        # The HTTP connection pools are also shared by all the sessions
+        self._transport = api.Transport(
+            pool_connections, pool_maxsize, keepalive_idle=pool_keepalive_idle
+        )
+        # The thread pool used to make concurrent requests is also shared
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            int(max_workers), thread_name_prefix="azimuth-openstack"
+        )
+        # Pages are prefetched using a separate pool, so that tasks running in the
+        # main pool never wait for tasks queued behind them
+        self._page_executor = None
+        if prefetch_pages:
+            self._page_executor = concurrent.futures.ThreadPoolExecutor(
+                int(max_workers), thread_name_prefix="azimuth-openstack-pages"
+            )
+        # Waiting for new project shares to become available can take minutes, so it
+        # happens in a dedicated pool rather than the one used to serve requests
+        self._share_executor = concurrent.futures.ThreadPoolExecutor(
+            int(max_workers), thread_name_prefix="azimuth-openstack-shares"
+        )
+        self._stream_lists = stream_lists
+        # If Coral credits are configured, use a client that pools connections to Coral
+        # and caches the accounts and allocations
+        self._coral = None
+        coral_settings = cloud_settings.CORAL_CREDITS
+        if coral_settings.CORAL_URI and coral_settings.TOKEN:
+            self._coral = coral.Client(
+                coral_settings.CORAL_URI,
+                coral_settings.TOKEN,
+                coral_settings.TIMEOUT,
+                self._transport.session(),
+                self._cache,
+            )
+
+    def connection_pool_metrics(self):
+        """
+        Returns metrics for the HTTP connection pools used to talk to OpenStack.
+        """
+        return self._transport.metrics()
 
     def _from_auth_session(self, auth_session, auth_user):
         return UnscopedSession(
@@ -195,6 +406,13 @@ class Provider(base.Provider):
             self._internal_net_cidr,
             self._internal_net_dns_nameservers,
             self._supports_machines,
+            self._cache,
+            self._transport,
+            self._executor,
+            self._page_executor,
+            self._stream_lists,
+            self._coral,
+            self._share_executor,
         )
 
 
@@ -218,6 +436,13 @@ class UnscopedSession(base.UnscopedSession):
         internal_net_cidr="192.168.3.0/24",
         internal_net_dns_nameservers=None,
         supports_machines=True,
+        cache=None,
+        transport=None,
+        executor=None,
+        page_executor=None,
+        stream_lists=False,
+        coral_client=None,
+        share_executor=None,
     ):
         super().__init__(auth_session, auth_user)
         self._metadata_prefix = metadata_prefix
@@ -229,13 +454,27 @@ class UnscopedSession(base.UnscopedSession):
         self._internal_net_cidr = internal_net_cidr
         self._internal_net_dns_nameservers = internal_net_dns_nameservers
         self._supports_machines = supports_machines
+        self._cache = cache or Cache()
+        self._transport = transport
+        self._executor = executor
+        self._page_executor = page_executor
+        self._stream_lists = stream_lists
+        self._coral = coral_client
+        self._share_executor = share_executor
 
     @convert_exceptions
-    def _scoped_session(self, auth_user, tenancy, credential_data):
+    def _scoped_session(self, auth_user, tenancy, credential_data, token_data=None):
         return ScopedSession(
             auth_user,
             tenancy,
-            api.Connection.from_clouds(yaml.safe_load(credential_data)),
+            api.Connection.from_clouds(
+                yaml.safe_load(credential_data),
+                self._cache,
+                token_data,
+                transport=self._transport,
+                page_executor=self._page_executor,
+                stream_lists=self._stream_lists,
+            ),
             self._metadata_prefix,
             self._internal_net_template,
             self._external_net_template,
@@ -245,6 +484,10 @@ class UnscopedSession(base.UnscopedSession):
             self._internal_net_cidr,
             self._internal_net_dns_nameservers,
             self._supports_machines,
+            self._cache,
+            self._executor,
+            self._coral,
+            self._share_executor,
         )
 
 
@@ -269,6 +512,10 @@ class ScopedSession(base.ScopedSession):
         internal_net_cidr="192.168.3.0/24",
         internal_net_dns_nameservers=None,
         supports_machines=True,
+        cache=None,
+        executor=None,
+        coral_client=None,
+        share_executor=None,
     ):
         super().__init__(auth_user, tenancy)
         self._connection = connection
@@ -281,6 +528,13 @@ class ScopedSession(base.ScopedSession):
         self._internal_net_cidr = internal_net_cidr
         self._internal_net_dns_nameservers = internal_net_dns_nameservers
         self._supports_machines = supports_machines
+        self._cache = cache or Cache()
+        # If no executor is given, the session owns the executor it creates
+        self._owns_executor = executor is None
+        self._executor = executor or concurrent.futures.ThreadPoolExecutor(4)
+        self._coral = coral_client
+        # The executor used to wait for new project shares in the background
+        self._share_executor = share_executor or self._executor
 
         # TODO(johngarbutt): consider moving some of this to config
         # and/or hopefully having this feature on by default
@@ -326,16 +580,14 @@ class ScopedSession(base.ScopedSession):
             supports_machines=self._supports_machines,
         )
 
-    @convert_exceptions
-    def quotas(self):
+    def _compute_quotas(self):
         """
-        See :py:meth:`.base.ScopedSession.quotas`.
+        Returns the quotas for the compute service.
         """
-        self._log("Fetching tenancy quotas")
         # Compute provides a way to fetch this information through the SDK, but
         # the floating IP quota obtained through it is rubbish...
         compute_limits = self._connection.compute.limits.absolute
-        quotas = [
+        return [
             dto.Quota(
                 "cpus",
                 "CPUs",
@@ -363,54 +615,92 @@ class ScopedSession(base.ScopedSession):
                 dto.QuotaType.COMPUTE,
             ),
         ]
-        # Get the floating ip quota
-        network_quotas = self._connection.network.quotas
-        quotas.append(
+
+    def _network_quotas(self):
+        """
+        Returns the quotas for the network service.
+        """
+        # Get the floating ip quota, including the usage if possible
+        try:
+            floatingip = self._connection.network.quota_details.floatingip
+        except rackit.NotFound:
+            # If the quota details extension is not available, list the IPs instead
+            floatingip_quota = self._connection.network.quotas.floatingip
+            floatingip_used = len(
+                list(self._connection.network.floatingips.all(fields=["id"]))
+            )
+        else:
+            floatingip_quota = floatingip["limit"]
+            floatingip_used = floatingip["used"]
+        return [
             dto.Quota(
                 "external_ips",
                 "External IPs",
                 None,
-                network_quotas.floatingip,
-                # Just get the length of the list of IPs
-                len(list(self._connection.network.floatingips.all())),
+                floatingip_quota,
+                floatingip_used,
                 dto.QuotaType.NETWORK,
             )
-        )
-        # Get coral credits if available
-        if not (
-            cloud_settings.CORAL_CREDITS.CORAL_URI is None
-            or cloud_settings.CORAL_CREDITS.TOKEN is None
-        ):
-            quotas.extend(self._get_coral_quotas())
+        ]
+
+    def _coral_quotas(self):
+        """
+        Returns the Coral credits quotas, if available.
+        """
+        if not self._coral:
+            return []
+        return self._get_coral_quotas()
+
+    def _volume_quotas(self):
+        """
+        Returns the quotas for the volume service.
+        """
         # The volume service is optional
         # In the case where the service is not enabled, just don't add the quotas
         try:
             volume_limits = self._connection.block_store.limits.absolute
-            quotas.extend(
-                [
-                    dto.Quota(
-                        "storage",
-                        "Volume Storage",
-                        "GB",
-                        volume_limits.total_volume_gigabytes,
-                        volume_limits.total_gigabytes_used,
-                        dto.QuotaType.BLOCK_STORAGE,
-                    ),
-                    dto.Quota(
-                        "volumes",
-                        "Volumes",
-                        None,
-                        volume_limits.volumes,
-                        volume_limits.volumes_used,
-                        dto.QuotaType.BLOCK_STORAGE,
-                    ),
-                ]
-            )
         except api.ServiceNotSupported:
-            pass
-        return quotas
+            return []
+        return [
+            dto.Quota(
+                "storage",
+                "Volume Storage",
+                "GB",
+                volume_limits.total_volume_gigabytes,
+                volume_limits.total_gigabytes_used,
+                dto.QuotaType.BLOCK_STORAGE,
+            ),
+            dto.Quota(
+                "volumes",
+                "Volumes",
+                None,
+                volume_limits.volumes,
+                volume_limits.volumes_used,
+                dto.QuotaType.BLOCK_STORAGE,
+            ),
+        ]
 
-    def _coral_quotas_from_allocation(self, allocation, headers):
+    @convert_exceptions
+    def quotas(self):
+        """
+        See :py:meth:`.base.ScopedSession.quotas`.
+        """
+        self._log("Fetching tenancy quotas")
+        # The quotas for each service are fetched concurrently
+        # The results are combined in a fixed order, and if more than one service
+        # fails the error from the first one in that order is raised
+        futures = [
+            self._executor.submit(fetch)
+            for fetch in (
+                self._compute_quotas,
+                self._network_quotas,
+                self._coral_quotas,
+                self._volume_quotas,
+            )
+        ]
+        return [quota for future in futures for quota in future.result()]
+
+    def _coral_quotas_from_allocation(self, allocation):
         quotas = []
 
         human_readable_names = {
@@ -441,13 +731,7 @@ class ScopedSession(base.ScopedSession):
         # Add quotas for Coral resource quotas
         active_allocation_id = allocation["id"]
 
-        allocation_resources = requests.get(
-            cloud_settings.CORAL_CREDITS.CORAL_URI
-            + "/allocation/"
-            + str(active_allocation_id)
-            + "/resources",
-            headers=headers,
-        ).json()
+        allocation_resources = self._coral.allocation_resources(active_allocation_id)
 
         if len(allocation_resources) == 0:
             self._log("Allocated resources found in allocation", level=logging.WARN)
@@ -468,17 +752,7 @@ class ScopedSession(base.ScopedSession):
         return quotas
 
     def _get_coral_quotas(self):
-        headers = {"Authorization": "Bearer " + cloud_settings.CORAL_CREDITS.TOKEN}
-        accounts = requests.get(
-            cloud_settings.CORAL_CREDITS.CORAL_URI + "/resource_provider_account",
-            headers=headers,
-        ).json()
-
-        tenancy_account_list = list(
-            filter(
-                lambda a: a["project_id"].replace("-", "") == self._tenancy.id, accounts
-            )
-        )
+        tenancy_account_list = self._coral.accounts(self._tenancy.id)
         if len(tenancy_account_list) != 1:
             self._log(
                 (
@@ -490,12 +764,7 @@ class ScopedSession(base.ScopedSession):
             )
             return []
         tenancy_account = tenancy_account_list[0]["account"]
-        all_allocations = requests.get(
-            cloud_settings.CORAL_CREDITS.CORAL_URI + "/allocation", headers=headers
-        ).json()
-        account_allocations = filter(
-            lambda a: a["account"] == tenancy_account, all_allocations
-        )
+        account_allocations = self._coral.allocations(tenancy_account)
 
         current_time = make_aware(datetime.datetime.now())
         target_tz = current_time.tzinfo
@@ -510,9 +779,7 @@ class ScopedSession(base.ScopedSession):
         )
 
         if len(active_allocation_list) == 1:
-            return self._coral_quotas_from_allocation(
-                active_allocation_list[0], headers
-            )
+            return self._coral_quotas_from_allocation(active_allocation_list[0])
         else:
             self._log(
                 (
@@ -552,22 +819,87 @@ class ScopedSession(base.ScopedSession):
             metadata=metadata,
         )
 
+    def _fetch_image_catalogue(self):
+        """
+        Fetches the full image catalogue for the project and caches it.
+        """
+        images_by_id = {}
+        updated_at = None
+        # Fetch from the SDK using our custom image resource
+        for image in self._connection.image.images.all(
+            status="active",
+            # Only show shared images that have been accepted
+            member_status="accepted",
+        ):
+            images_by_id[image.id] = self._from_api_image(image)
+            updated_at = max(updated_at or "", getattr(image, "updated_at", "") or "")
+        catalogue = ImageCatalogue(images_by_id, updated_at or None, time.time())
+        self._cache.set(self._connection.project_id, "images", catalogue)
+        self._cache.set(self._connection.project_id, "images.fresh", True)
+        return catalogue
+
+    def _revalidate_image_catalogue(self, catalogue):
+        """
+        Brings the given image catalogue up to date by fetching only the images that
+        have been updated since the catalogue was fetched.
+
+        Images that have been deleted or unshared since the full list was fetched are
+        only removed when the full list is next fetched.
+        """
+        project_id = self._connection.project_id
+        # If the catalogue was revalidated recently, there is nothing to do
+        if self._cache.get(project_id, "images.fresh"):
+            return catalogue
+        # If there is nothing to compare timestamps with, just fetch the full list
+        if not catalogue.updated_at:
+            return self._fetch_image_catalogue()
+        images_by_id = dict(catalogue.images_by_id)
+        updated_at = catalogue.updated_at
+        # Don't filter by status, so that we see images that have become inactive
+        changed = self._connection.image.images.all(
+            member_status="accepted", updated_at=f"gte:{catalogue.updated_at}"
+        )
+        for image in changed:
+            if image.status == "active":
+                images_by_id[image.id] = self._from_api_image(image)
+            else:
+                images_by_id.pop(image.id, None)
+            updated_at = max(updated_at, getattr(image, "updated_at", "") or "")
+        catalogue = dataclasses.replace(
+            catalogue, images_by_id=images_by_id, updated_at=updated_at
+        )
+        # Keep the expiry of the full catalogue the same
+        remaining = self._cache.ttl("images") - (time.time() - catalogue.fetched_at)
+        if remaining >= 1:
+            self._cache.set(project_id, "images", catalogue, int(remaining))
+        self._cache.set(project_id, "images.fresh", True)
+        return catalogue
+
+    def _image_catalogue(self):
+        """
+        Returns the image catalogue for the project, using the cache if possible.
+        """
+        catalogue = self._cache.get(self._connection.project_id, "images")
+        if catalogue:
+            return self._revalidate_image_catalogue(catalogue)
+        else:
+            return self._fetch_image_catalogue()
+
+    def invalidate_images(self):
+        """
+        Invalidates the cached image catalogue for the project.
+        """
+        self._cache.invalidate(self._connection.project_id, "images", "images.fresh")
+
     @convert_exceptions
     def images(self):
         """
         See :py:meth:`.base.ScopedSession.images`.
         """
         self._log("Fetching available images")
-        # Fetch from the SDK using our custom image resource
-        images = list(
-            self._connection.image.images.all(
-                status="active",
-                # Only show shared images that have been accepted
-                member_status="accepted",
-            )
-        )
+        images = tuple(self._image_catalogue().images_by_id.values())
         self._log("Found %s images", len(images))
-        return tuple(self._from_api_image(i) for i in images)
+        return images
 
     @convert_exceptions
     def find_image(self, id):  # noqa: A002
@@ -575,6 +907,15 @@ class ScopedSession(base.ScopedSession):
         See :py:meth:`.base.ScopedSession.find_image`.
         """
         self._log("Fetching image with id '%s'", id)
+        # Only use the catalogue if it is already cached, as fetching the whole
+        # catalogue is more expensive than fetching a single image
+        catalogue = self._cache.get(self._connection.project_id, "images")
+        if catalogue:
+            image = self._revalidate_image_catalogue(catalogue).images_by_id.get(id)
+            if image:
+                return image
+        # Images that are not in the catalogue, e.g. shared images that have not
+        # been accepted, can still be fetched directly
         # Just convert the SDK image to a DTO image
         return self._from_api_image(self._connection.image.images.get(id))
 
@@ -593,17 +934,39 @@ class ScopedSession(base.ScopedSession):
             getattr(api_flavor, "extra_specs", None) or {},
         )
 
+    def _flavor_catalogue(self):
+        """
+        Returns the flavor catalogue for the project, using the cache if possible.
+        """
+        project_id = self._connection.project_id
+        catalogue = self._cache.get(project_id, "flavors")
+        if catalogue is None:
+            self._log("Fetching flavors")
+            sizes_by_id = {}
+            enabled_ids = []
+            ids_by_name = {}
+            for flavor in self._connection.compute.flavors.all():
+                sizes_by_id[flavor.id] = self._from_api_flavor(flavor)
+                ids_by_name[flavor.name] = flavor.id
+                if not flavor.is_disabled:
+                    enabled_ids.append(flavor.id)
+            catalogue = FlavorCatalogue(sizes_by_id, tuple(enabled_ids), ids_by_name)
+            self._cache.set(project_id, "flavors", catalogue)
+        return catalogue
+
+    def invalidate_sizes(self):
+        """
+        Invalidates the cached flavor catalogue for the project.
+        """
+        self._cache.invalidate(self._connection.project_id, "flavors")
+
     @convert_exceptions
     def sizes(self):
         """
         See :py:meth:`.base.ScopedSession.sizes`.
         """
         self._log("Fetching available flavors")
-        flavors = tuple(
-            self._from_api_flavor(flavor)
-            for flavor in self._connection.compute.flavors.all()
-            if not flavor.is_disabled
-        )
+        flavors = self._flavor_catalogue().sizes()
         self._log("Found %s flavors", len(flavors))
         return flavors
 
@@ -613,7 +976,17 @@ class ScopedSession(base.ScopedSession):
         See :py:meth:`.base.ScopedSession.find_size`.
         """
         self._log("Fetching flavor with id '%s'", id)
-        return self._from_api_flavor(self._connection.compute.flavors.get(id))
+        size = self._flavor_catalogue().find_by_id(id)
+        if size:
+            return size
+        # If the flavor is not in the catalogue, it may have been created since the
+        # catalogue was cached, so fetch it directly and discard the stale catalogue
+        size = self._from_api_flavor(self._connection.compute.flavors.get(id))
+        self.invalidate_sizes()
+        return size
+
+    #: The network fields used by the provider when discovering networks
+    _NETWORK_FIELDS = ("name", "project_id")
 
     def _tagged_network(self, net_type):
         """
@@ -631,7 +1004,11 @@ class ScopedSession(base.ScopedSession):
             else {"project_id": None}
         )
 
-        networks = list(self._connection.network.networks.all(tags=tag, **kwargs))
+        networks = list(
+            self._connection.network.networks.all(
+                tags=tag, fields=self._NETWORK_FIELDS, **kwargs
+            )
+        )
 
         if len(networks) == 1:
             net_owner = (
@@ -679,7 +1056,11 @@ class ScopedSession(base.ScopedSession):
             if net_type == "internal" and not self._allow_shared_internal_net
             else {"project_id": None}
         )
-        networks = list(self._connection.network.networks.all(name=net_name, **kwargs))
+        networks = list(
+            self._connection.network.networks.all(
+                name=net_name, fields=self._NETWORK_FIELDS, **kwargs
+            )
+        )
 
         if len(networks) == 1:
             net_owner = (
@@ -710,6 +1091,28 @@ class ScopedSession(base.ScopedSession):
             )
             raise errors.InvalidOperationError(f"Could not find {net_type} network.")
 
+    def _network_topology(self):
+        """
+        Returns the cached networks for the project, indexed by network type.
+        """
+        return self._cache.get(self._connection.project_id, "networks") or {}
+
+    def _cache_network(self, net_type, network):
+        """
+        Caches the network of the given type for the project and returns a reference
+        to it.
+        """
+        ref = NetworkRef(network.id, network.name) if network else None
+        topology = {**self._network_topology(), net_type: ref}
+        self._cache.set(self._connection.project_id, "networks", topology)
+        return ref
+
+    def invalidate_networks(self):
+        """
+        Invalidates the cached networks for the project.
+        """
+        self._cache.invalidate(self._connection.project_id, "networks")
+
     def _tenant_network(self, create_network=False):
         """
         Returns the tenant internal network.
@@ -719,6 +1122,17 @@ class ScopedSession(base.ScopedSession):
 
         If create_network = False then None is returned when the network is not found.
         """
+        topology = self._network_topology()
+        # A network that was not found is only reused if we are not creating it
+        if topology.get("internal") or ("internal" in topology and not create_network):
+            return topology["internal"]
+        network = self._discover_tenant_network(create_network)
+        return self._cache_network("internal", network)
+
+    def _discover_tenant_network(self, create_network):
+        """
+        Discovers the tenant internal network, creating it if requested and permitted.
+        """
         # First, try to find a network that is tagged as the portal internal network
         tagged_network = self._tagged_network("internal")
         if tagged_network:
@@ -730,6 +1144,8 @@ class ScopedSession(base.ScopedSession):
         if not create_network:
             return None
         if self._create_internal_net:
+            # The cached networks are no longer valid once we start creating them
+            self.invalidate_networks()
             # Unfortunately, the tags cannot be set in the POST request
             self._log("Creating internal network")
             network = self._connection.network.networks.create(name="portal-internal")
@@ -767,7 +1183,10 @@ class ScopedSession(base.ScopedSession):
         else:
             raise errors.InvalidOperationError("Could not find internal network.")
 
-    def _project_share(self, create_share=True):  # noqa: C901
+    #: The maximum number of seconds to wait for a new project share to be available
+    _PROJECT_SHARE_READY_TIMEOUT = 300
+
+    def _project_share(self, create_share=True):
         """
         Returns the project specific Manila share.
 
@@ -779,101 +1198,194 @@ class ScopedSession(base.ScopedSession):
         If we find a valid share, we return that object.
 
         Finally, we look to create the share dynamically,
-        then return that share.
+        then return that share. The share is made available
+        to the project user in the background, so that we
+        don't block waiting for Manila.
 
         If this project has not available share type in
         Manila, we simply log that we can't create a share
         for this project, and return None.
+
+        Once a valid share has been found, it is cached
+        for the project. A share that is still being made
+        available, possibly by another process, is returned
+        as pending and is not cached.
         """
         if not self._manila_project_share_gb:
             return
 
-        # find if project share exists
-        project_share = None
-        current_shares = self._connection.share.shares.all()
-        for share in current_shares:
-            if share.name == self._project_share_name:
-                project_share = share
+        project_id = self._connection.project_id
+        project_share = self._cache.get(project_id, "share")
+        if not project_share:
+            # A share that is being made available in the background is returned as-is
+            project_share = self._cache.get(project_id, "share.pending")
         if project_share:
-            # double check share has the correct protocol and is available
-            share_details = self._connection.share.shares.get(project_share.id)
-            self._log(f"Got share details f{share_details}")
-            if share_details.share_proto.upper() != "CEPHFS":
-                raise errors.ImproperlyConfiguredError(
-                    "Currently only support CephFS shares!"
-                )
-            if share_details.status.lower() != "available":
-                raise errors.ImproperlyConfiguredError(
-                    "Project share is not available!"
-                )
-            if share_details.access_rules_status.lower() != "active":
-                raise errors.ImproperlyConfiguredError(
-                    "Project share has a problem with its access rules!"
-                )
+            return project_share
 
-            access_list = list(
-                self._connection.share.access.all(share_id=project_share.id)
+        project_share = self._find_project_share()
+        if project_share:
+            if not project_share.pending:
+                self._cache.set(project_id, "share", project_share)
+        # no share found, create if required
+        elif create_share:
+            project_share = self._create_project_share()
+        return project_share
+
+    def _find_project_share(self):
+        """
+        Returns the project share if it exists and is valid, or None if it doesn't
+        exist.
+
+        A share that is still being created, or that was created recently and is
+        still waiting for access to be granted, is returned as pending.
+        """
+        # find if project share exists
+        project_share = next(
+            self._connection.share.shares.all(name=self._project_share_name), None
+        )
+        if not project_share:
+            return None
+        # double check share has the correct protocol and is available
+        share_details = self._connection.share.shares.get(project_share.id)
+        self._log(f"Got share details f{share_details}")
+        if share_details.share_proto.upper() != "CEPHFS":
+            raise errors.ImproperlyConfiguredError(
+                "Currently only support CephFS shares!"
+            )
+        pending_share = ShareRef(project_share.id, project_share.name, True)
+        if share_details.status.lower() == "creating":
+            self._log(f"Project share is being created: {project_share.id}")
+            return pending_share
+        if share_details.status.lower() != "available":
+            raise errors.ImproperlyConfiguredError("Project share is not available!")
+        if share_details.access_rules_status.lower() == "syncing":
+            self._log(f"Project share access rules are syncing: {project_share.id}")
+            return pending_share
+        if share_details.access_rules_status.lower() != "active":
+            raise errors.ImproperlyConfiguredError(
+                "Project share has a problem with its access rules!"
             )
-            found_expected_access = False
-            for access in access_list:
-                if access.access_to == self._project_share_user:
-                    found_expected_access = True
-                    break
-            if not found_expected_access:
-                raise errors.ImproperlyConfiguredError(
-                    "can't find the expected access rule!"
-                )
-            self._log(f"Found project share for: {self._connection.project_id}")
 
-        # no share found, create if required
-        if not project_share and create_share:
-            self._log(f"Creating project share for: {self._connection.project_id}")
-
-            # Find share type
-            default_share_type = None
-            all_types = list(self._connection.share.types.all())
-            if len(all_types) == 1:
-                default_share_type = all_types[0]
-            else:
-                for share_type in all_types:
-                    if share_type.is_default:
-                        default_share_type = share_type
-                        break
-            if not default_share_type:
-                # Silent ignore here, as it usually means project
-                # has not been setup for manila
-                self._log("Unable to find valid share type!")
-                return
-
-            # TODO(johngarbutt) need to support non-ceph types eventually
-            project_share = self._connection.share.shares.create(
-                share_proto="CephFS",
-                size=self._manila_project_share_gb,
-                name=self._project_share_name,
-                description="Project share auto-created by Azimuth.",
-                share_type=default_share_type.id,
+        access_list = list(self._connection.share.access.all(share_id=project_share.id))
+        found_expected_access = False
+        for access in access_list:
+            if access.access_to == self._project_share_user:
+                found_expected_access = True
+                break
+        if not found_expected_access:
+            # Access is granted in the background once the share is available, so a
+            # recently created share may not have the rule yet
+            created_at = dateutil.parser.parse(share_details.created_at)
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+            age = datetime.datetime.now(datetime.timezone.utc) - created_at
+            if age.total_seconds() < self._PROJECT_SHARE_READY_TIMEOUT:
+                self._log(f"Project share is waiting for access: {project_share.id}")
+                return pending_share
+            raise errors.ImproperlyConfiguredError(
+                "can't find the expected access rule!"
             )
+        self._log(f"Found project share for: {self._connection.project_id}")
+        return ShareRef(project_share.id, project_share.name)
 
+    def _create_project_share(self):
+        """
+        Creates the project share and returns it, or returns None if the project has
+        no share type.
+
+        Access to the share is granted in the background once it is available.
+        """
+        project_id = self._connection.project_id
+        self._log(f"Creating project share for: {project_id}")
+
+        # Find share type
+        default_share_type = None
+        all_types = list(self._connection.share.types.all())
+        if len(all_types) == 1:
+            default_share_type = all_types[0]
+        else:
+            for share_type in all_types:
+                if share_type.is_default:
+                    default_share_type = share_type
+                    break
+        if not default_share_type:
+            # Silent ignore here, as it usually means project
+            # has not been setup for manila
+            self._log("Unable to find valid share type!")
+            return
+
+        # TODO(johngarbutt) need to support non-ceph types eventually
+        project_share = self._connection.share.shares.create(
+            share_proto="CephFS",
+            size=self._manila_project_share_gb,
+            name=self._project_share_name,
+            description="Project share auto-created by Azimuth.",
+            share_type=default_share_type.id,
+        )
+        project_share = ShareRef(project_share.id, project_share.name, True)
+        # Until access has been granted, other requests should not try to validate
+        # or create the share
+        self._cache.set(project_id, "share.pending", project_share)
+        # The background task outlives this session, so it gets its own connection
+        self._share_executor.submit(
+            self._grant_project_share_access, self._connection.clone(), project_share
+        )
+        return project_share
+
+    def _grant_project_share_access(self, connection, project_share):
+        """
+        Waits for the given project share to become available and grants access to it
+        for the project user.
+
+        This runs in the background using the given connection, which it closes when
+        it is done. Errors are logged rather than raised.
+        """
+        project_id = connection.project_id
+        try:
             # wait for share to be available before trying to grant access
-            for _ in range(10):
-                latest = self._connection.share.shares.get(project_share.id)
+            deadline = time.monotonic() + self._PROJECT_SHARE_READY_TIMEOUT
+            delay = 0.1
+            while True:
+                latest = connection.share.shares.get(project_share.id)
                 if latest.status.lower() == "available":
                     break
                 if latest.status.lower() == "error":
                     raise errors.Error("Unable to create project share.")
-                time.sleep(0.1)
+                if time.monotonic() > deadline:
+                    raise errors.Error("Timed out waiting for project share.")
+                time.sleep(delay)
+                delay = min(2 * delay, 5)
 
-            project_share.grant_rw_access(self._project_share_user)
+            latest.grant_rw_access(self._project_share_user)
             # TODO(johngarbutt) should we wait for access to be granted?
             self._log(f"Created new project share: {project_share.id}")
-
-        return project_share
+            self._cache.set(
+                project_id, "share", dataclasses.replace(project_share, pending=False)
+            )
+        except Exception:
+            self._log(
+                "Failed to make project share available",
+                level=logging.ERROR,
+                exc_info=True,
+            )
+        finally:
+            self._cache.invalidate(project_id, "share.pending")
+            connection.close()
 
     def _external_network(self):
         """
         Returns the external network that connects the tenant router to the outside
         world.
         """
+        topology = self._network_topology()
+        if topology.get("external"):
+            return topology["external"]
+        return self._cache_network("external", self._discover_external_network())
+
+    def _discover_external_network(self):
+        """
+        Discovers the external network.
+        """
         # First, try to find a network that is tagged as the portal external network
         tagged_network = self._tagged_network("external")
         if tagged_network:
@@ -882,7 +1394,7 @@ class ScopedSession(base.ScopedSession):
         if self._external_net_template:
             return self._templated_network(self._external_net_template, "external")
         # If there is exactly one external network available, use that
-        params = {"router:external": True}
+        params = {"router:external": True, "fields": self._NETWORK_FIELDS}
         networks = list(self._connection.network.networks.all(**params)) + list(
             self._connection.network.networks.all(**params, project_id=None)
         )
@@ -897,6 +1409,15 @@ class ScopedSession(base.ScopedSession):
         """
         Returns the direct storage network.
         """
+        topology = self._network_topology()
+        if "storage" in topology:
+            return topology["storage"]
+        return self._cache_network("storage", self._discover_storage_network())
+
+    def _discover_storage_network(self):
+        """
+        Discovers the direct storage network.
+        """
         # Try to find a network that is tagged as the portal storage network
         tagged_network = self._tagged_network("storage")
 
@@ -991,24 +1512,82 @@ class ScopedSession(base.ScopedSession):
             dateutil.parser.parse(api_server.created),
         )
 
+    def _fetch_server_inventory(self, flavors, get_tenant_network):
+        """
+        Fetches the full server inventory for the project and caches it.
+        """
+        machines_by_id = {}
+        updated_at = None
+        for server in self._connection.compute.servers.all():
+            machines_by_id[server.id] = self._from_api_server(
+                server, flavors, get_tenant_network
+            )
+            updated_at = max(updated_at or "", getattr(server, "updated", "") or "")
+        inventory = ServerInventory(machines_by_id, updated_at or None, time.time())
+        self._cache.set(self._connection.project_id, "servers", inventory)
+        return inventory
+
+    def _refresh_server_inventory(self, inventory, flavors, get_tenant_network):
+        """
+        Brings the given server inventory up to date by fetching only the servers that
+        have changed since the inventory was last refreshed.
+        """
+        project_id = self._connection.project_id
+        # If there is nothing to compare timestamps with, just fetch the full list
+        if not inventory.updated_at:
+            return self._fetch_server_inventory(flavors, get_tenant_network)
+        machines_by_id = dict(inventory.machines_by_id)
+        updated_at = inventory.updated_at
+        # When changes-since is given, Nova also returns servers that were deleted
+        changed = self._connection.compute.servers.all(
+            **{"changes-since": inventory.updated_at}
+        )
+        for server in changed:
+            if server.status == "DELETED":
+                machines_by_id.pop(server.id, None)
+            else:
+                machines_by_id[server.id] = self._from_api_server(
+                    server, flavors, get_tenant_network
+                )
+            updated_at = max(updated_at, getattr(server, "updated", "") or "")
+        inventory = dataclasses.replace(
+            inventory, machines_by_id=machines_by_id, updated_at=updated_at
+        )
+        # Keep the expiry of the full inventory the same
+        remaining = self._cache.ttl("servers") - (time.time() - inventory.fetched_at)
+        if remaining >= 1:
+            self._cache.set(project_id, "servers", inventory, int(remaining))
+        return inventory
+
+    def invalidate_machines(self):
+        """
+        Invalidates the cached server inventory for the project.
+        """
+        self._cache.invalidate(self._connection.project_id, "servers")
+
     @convert_exceptions
     def machines(self):
         """
         See :py:meth:`.base.ScopedSession.machines`.
         """
         self._log("Fetching available servers")
-        api_servers = tuple(self._connection.compute.servers.all())
-        self._log("Found %s servers", len(api_servers))
         # We need to be able to look up the flavor ID from the name, which is all that
         # is reported
-        # To avoid multiple queries, we look up all the flavors and index them by name
-        flavors = {f.name: f.id for f in self._connection.compute.flavors.all()}
+        # The flavor catalogue indexes the flavors by name for us
+        flavors = self._flavor_catalogue().ids_by_name
         # Note that this will (a) only load the network if required and (b)
         # reuse the network once loaded
         get_tenant_network = Lazy(self._tenant_network)
-        return tuple(
-            self._from_api_server(s, flavors, get_tenant_network) for s in api_servers
-        )
+        inventory = self._cache.get(self._connection.project_id, "servers")
+        if inventory:
+            inventory = self._refresh_server_inventory(
+                inventory, flavors, get_tenant_network
+            )
+        else:
+            inventory = self._fetch_server_inventory(flavors, get_tenant_network)
+        machines = tuple(inventory.machines_by_id.values())
+        self._log("Found %s servers", len(machines))
+        return machines
 
     @convert_exceptions
     def find_machine(self, id):  # noqa: A002
@@ -1019,8 +1598,8 @@ class ScopedSession(base.ScopedSession):
         server = self._connection.compute.servers.get(id)
         # We need to be able to look up the flavor from the name
         # It is not possible to filter the query by name using GET params, so the best
-        # we can do it query the list and index it
-        flavors = {f.name: f.id for f in self._connection.compute.flavors.all()}
+        # we can do is use the indexed flavor catalogue
+        flavors = self._flavor_catalogue().ids_by_name
         # Don't discover the tenant network unless the server is found
         get_tenant_network = Lazy(self._tenant_network)
         return self._from_api_server(server, flavors, get_tenant_network)
@@ -1036,6 +1615,118 @@ class ScopedSession(base.ScopedSession):
         # Split the logs into lines before returning them
         return logs.splitlines()
 
+    #: The number of lines at the end of the console log used to locate the lines that
+    #: follow them in a later tail
+    _CONSOLE_LOG_ANCHOR_LINES = 3
+    #: The number of lines in the first tail used to find the new console log lines
+    _CONSOLE_LOG_INITIAL_TAIL = 100
+    #: The maximum number of lines in a tail used to find the new console log lines
+    _CONSOLE_LOG_MAX_TAIL = 6400
+
+    def _console_log_tail(self, server, length):
+        """
+        Returns the given number of lines from the end of the console log for the
+        server, and whether they are the whole log.
+        """
+        lines = server.logs(length).splitlines()
+        return lines, not length or len(lines) < length
+
+    def _console_log_key(self, machine, limit, offset):
+        """
+        Returns the cache key for the anchor at the given offset.
+
+        Offsets are only meaningful to the viewer that they were returned to, so the
+        key includes the user and the tail size.
+        """
+        return f"{self.user_id()}:{machine}:{limit}:{offset}"
+
+    def _console_log_anchor(self, machine, limit, offset, lines, absolute):
+        """
+        Records the last lines of the console log returned up to the given offset,
+        so that the lines that follow can be located in a later tail.
+
+        If ``absolute`` is true, the offset is the number of lines in the log rather
+        than relative to the lines returned by a previous tail.
+        """
+        anchor = tuple(lines[-self._CONSOLE_LOG_ANCHOR_LINES :])
+        self._cache.set(
+            self._console_log_key(machine, limit, offset), "logs", (absolute, anchor)
+        )
+
+    def _find_console_log_anchor(self, lines, anchor, offset, absolute, complete):
+        """
+        Returns the indexes in the given tail of the console log of the lines that
+        could follow the anchor.
+
+        When the tail is the whole log and the offset is absolute, the new lines are
+        located by position. Otherwise every occurrence of the anchor is returned, and
+        only a single occurrence identifies the new lines unambiguously.
+        """
+        size = len(anchor)
+        if complete and absolute:
+            # The anchor must immediately precede the offset, otherwise the log has
+            # been replaced and we can't follow on from it
+            if tuple(lines[max(offset - size, 0) : offset]) == anchor:
+                return [offset]
+            else:
+                return []
+        if not anchor:
+            # An empty anchor means that the log was empty at the offset, so the
+            # lines only follow on if we have the whole log
+            return [0] if complete else []
+        return [
+            index + size
+            for index in range(len(lines) - size + 1)
+            if tuple(lines[index : index + size]) == anchor
+        ]
+
+    @convert_exceptions
+    def tail_logs_for_machine(self, machine, limit=None, offset=None):
+        """
+        See :py:meth:`.base.ScopedSession.tail_logs_for_machine`.
+        """
+        machine = machine.id if isinstance(machine, dto.Machine) else machine
+        self._log("Fetching log tail for machine '%s' (offset %s)", machine, offset)
+        server = self._connection.compute.servers.get(machine)
+        # Nova only allows us to request a number of lines from the end of the log,
+        # so the lines that were last returned are located in increasingly large
+        # tails until they are found
+        cached = None
+        if offset is not None and self._cache.enabled("logs"):
+            cached = self._cache.get(
+                self._console_log_key(machine, limit, offset), "logs"
+            )
+        if cached is not None:
+            absolute, anchor = cached
+            length = self._CONSOLE_LOG_INITIAL_TAIL
+            while True:
+                lines, complete = self._console_log_tail(server, length)
+                indexes = self._find_console_log_anchor(
+                    lines, anchor, offset, absolute, complete
+                )
+                if len(indexes) == 1:
+                    new_lines = lines[indexes[0] :]
+                    next_offset = offset + len(new_lines)
+                    self._console_log_anchor(
+                        machine, limit, next_offset, lines, absolute
+                    )
+                    if limit and len(new_lines) > limit:
+                        return dto.MachineLogs(new_lines[-limit:], next_offset, True)
+                    else:
+                        return dto.MachineLogs(new_lines, next_offset, False)
+                # If the anchor appears more than once, e.g. because the lines
+                # following it repeat it, we can't tell which lines are new
+                if indexes or complete or length >= self._CONSOLE_LOG_MAX_TAIL:
+                    break
+                length = length * 2
+        # If there is no offset, or we can't follow on from it, return the tail
+        lines, complete = self._console_log_tail(server, limit)
+        # If we don't have the whole log, we don't know the real number of lines
+        # so the offset is relative to the lines returned by this call
+        next_offset = len(lines)
+        self._console_log_anchor(machine, limit, next_offset, lines, complete)
+        return dto.MachineLogs(lines, next_offset, True)
+
     @convert_exceptions
     def create_machine(
         self, name, image, size, ssh_key=None, metadata=None, userdata=None
@@ -1086,6 +1777,8 @@ class ScopedSession(base.ScopedSession):
             userdata_b64 = base64.b64encode(userdata.encode()).decode()
             params.update(user_data=userdata_b64)
         server = self._connection.compute.servers.create(params)
+        # New servers are not reported by changes-since until they are first updated
+        self.invalidate_machines()
         return self.find_machine(server.id)
 
     @convert_exceptions
@@ -1096,6 +1789,7 @@ class ScopedSession(base.ScopedSession):
         machine = machine.id if isinstance(machine, dto.Machine) else machine
         self._log("Starting machine '%s'", machine)
         self._connection.compute.servers.get(machine).start()
+        self.invalidate_machines()
         return self.find_machine(machine)
 
     @convert_exceptions
@@ -1106,6 +1800,7 @@ class ScopedSession(base.ScopedSession):
         machine = machine.id if isinstance(machine, dto.Machine) else machine
         self._log("Stopping machine '%s'", machine)
         self._connection.compute.servers.get(machine).stop()
+        self.invalidate_machines()
         return self.find_machine(machine)
 
     @convert_exceptions
@@ -1116,6 +1811,7 @@ class ScopedSession(base.ScopedSession):
         machine = machine.id if isinstance(machine, dto.Machine) else machine
         self._log("Restarting machine '%s'", machine)
         self._connection.compute.servers.get(machine).reboot("SOFT")
+        self.invalidate_machines()
         return self.find_machine(machine)
 
     @convert_exceptions
@@ -1125,8 +1821,22 @@ class ScopedSession(base.ScopedSession):
         """
         machine = machine.id if isinstance(machine, dto.Machine) else machine
         self._log("Deleting machine '%s'", machine)
+        self._delete_server(machine)
+        self.invalidate_machines()
+        try:
+            return self.find_machine(machine)
+        except errors.ObjectNotFoundError:
+            return None
+
+    def _delete_server(self, machine):
+        """
+        Deletes the server with the given id, along with its ports and instance
+        security group.
+        """
         # First, delete any associated ports
-        for port in self._connection.network.ports.all(device_id=machine):
+        for port in self._connection.network.ports.all(
+            device_id=machine, fields=["id"]
+        ):
             port._delete()
         self._connection.compute.servers.delete(machine)
         # Once the machine is deleted, delete the instance security group
@@ -1134,10 +1844,64 @@ class ScopedSession(base.ScopedSession):
         secgroup = self._connection.network.security_groups.find_by_name(secgroup_name)
         if secgroup:
             secgroup._delete()
+            self.invalidate_security_groups()
+
+    @convert_exceptions
+    def _machine_action(self, action, machine, flavors, get_tenant_network):
+        """
+        Performs the given action on a single machine for a bulk action, returning
+        the updated machine.
+        """
+        servers = self._connection.compute.servers
+        if action == dto.MachineAction.START:
+            servers.get(machine).start()
+        elif action == dto.MachineAction.STOP:
+            servers.get(machine).stop()
+        elif action == dto.MachineAction.RESTART:
+            servers.get(machine).reboot("SOFT")
+        else:
+            self._delete_server(machine)
         try:
-            return self.find_machine(machine)
-        except errors.ObjectNotFoundError:
-            return None
+            server = servers.get(machine)
+        except rackit.NotFound:
+            # This is expected once a deleted server has gone
+            if action == dto.MachineAction.DELETE:
+                return None
+            raise
+        return self._from_api_server(server, flavors, get_tenant_network)
+
+    @convert_exceptions
+    def bulk_machine_action(self, action, machines):
+        """
+        See :py:meth:`.base.ScopedSession.bulk_machine_action`.
+        """
+        machine_ids = [
+            machine.id if isinstance(machine, dto.Machine) else machine
+            for machine in machines
+        ]
+        self._log("Performing action %s on machines %s", action.name, machine_ids)
+        # The flavor catalogue and tenant network are shared by all the results
+        flavors = self._flavor_catalogue().ids_by_name
+        get_tenant_network = Lazy(self._tenant_network)
+        # The actions are performed concurrently using the shared pool, which bounds
+        # the number of concurrent requests to OpenStack
+        futures = [
+            self._executor.submit(
+                self._machine_action, action, machine_id, flavors, get_tenant_network
+            )
+            for machine_id in machine_ids
+        ]
+        results = []
+        for machine_id, future in zip(machine_ids, futures):
+            try:
+                result = dto.MachineActionResult(machine_id, future.result())
+            except errors.Error as exc:
+                result = dto.MachineActionResult(machine_id, None, exc)
+            results.append(result)
+        # The changes are not all visible using changes-since until Nova updates
+        # the servers, so make sure they are reflected in the next listing
+        self.invalidate_machines()
+        return results
 
     def _api_rule_is_supported(self, api_rule):
         # Only consider IPv4 rules for protocols we recognise
@@ -1167,36 +1931,83 @@ class ScopedSession(base.ScopedSession):
             params.update(remote_cidr=api_rule["remote_ip_prefix"] or "0.0.0.0/0")
         return dto.FirewallRule(**params)
 
+    #: The security group fields used by the provider when fetching firewall rules
+    _SECURITY_GROUP_FIELDS = ("name", "security_group_rules")
+
+    def _security_group_index(self, names):
+        """
+        Returns an index of the security groups with the given names, using the cache
+        where possible.
+
+        The index contains the groups matching each name, with their rules, and the
+        names of those groups and of the remote groups referenced by their rules.
+        """
+        project_id = self._connection.project_id
+        index = self._cache.get(project_id, "secgroups") or {"groups": {}, "names": {}}
+        missing = [name for name in names if name not in index["groups"]]
+        if not missing:
+            return index
+        # Fetch only the groups that we don't already know about
+        self._log("Fetching security groups %s", missing)
+        groups = {name: [] for name in missing}
+        group_names = dict(index["names"])
+        for group in self._connection.network.security_groups.all(
+            name=missing, fields=self._SECURITY_GROUP_FIELDS
+        ):
+            groups[group.name].append(
+                {
+                    "id": group.id,
+                    "name": group.name,
+                    "rules": list(group.security_group_rules),
+                }
+            )
+            group_names[group.id] = group.name
+        # We also need the names of any groups that the rules refer to
+        remote_group_ids = {
+            rule["remote_group_id"]
+            for name_groups in groups.values()
+            for group in name_groups
+            for rule in group["rules"]
+            if rule["remote_group_id"] and rule["remote_group_id"] not in group_names
+        }
+        if remote_group_ids:
+            for group in self._connection.network.security_groups.all(
+                id=list(remote_group_ids), fields=["name"]
+            ):
+                group_names[group.id] = group.name
+        index = {"groups": {**index["groups"], **groups}, "names": group_names}
+        self._cache.set(project_id, "secgroups", index)
+        return index
+
+    def invalidate_security_groups(self):
+        """
+        Invalidates the cached security groups for the project.
+        """
+        self._cache.invalidate(self._connection.project_id, "secgroups")
+
     @convert_exceptions
     def fetch_firewall_rules_for_machine(self, machine):
         machine = machine.id if isinstance(machine, dto.Machine) else machine
-        # All we get from the machine is security group names
-        # This means that we need to load all the security groups to find them
-        self._log("Fetching security groups")
-        security_groups = list(self._connection.network.security_groups.all())
-        # Index the names of the security groups so we can easily resolve them later
-        secgroup_names = {s.id: s.name for s in security_groups}
-        self._log("Filtering machine security groups for '%s'", machine)
-        # Filter the security groups that apply to the machine
+        self._log("Fetching security groups for machine '%s'", machine)
         machine = self._connection.compute.servers.get(machine)
-        machine_security_groups = [
-            group
-            for group in security_groups
-            if group.name in {sg["name"] for sg in machine.security_groups}
-        ]
+        # All we get from the machine is security group names
+        # So we fetch only the security groups with those names
+        names = list(dict.fromkeys(sg["name"] for sg in machine.security_groups))
+        index = self._security_group_index(names)
         # The instance security group is the only editable one
         instance_secgroup = f"instance-{machine.id}"
         return [
             dto.FirewallGroup(
-                name=group.name,
-                editable=group.name == instance_secgroup,
+                name=group["name"],
+                editable=group["name"] == instance_secgroup,
                 rules=[
-                    self._from_api_security_group_rule(secgroup_names, rule)
-                    for rule in group.security_group_rules
+                    self._from_api_security_group_rule(index["names"], rule)
+                    for rule in group["rules"]
                     if self._api_rule_is_supported(rule)
                 ],
             )
-            for group in machine_security_groups
+            for name in names
+            for group in index["groups"][name]
         ]
 
     @convert_exceptions
@@ -1236,6 +2047,7 @@ class ScopedSession(base.ScopedSession):
         if remote_cidr:
             params.update(remote_ip_prefix=remote_cidr)
         _ = self._connection.network.security_group_rules.create(**params)
+        self.invalidate_security_groups()
         return self.fetch_firewall_rules_for_machine(machine)
 
     @convert_exceptions
@@ -1243,16 +2055,23 @@ class ScopedSession(base.ScopedSession):
         machine = machine.id if isinstance(machine, dto.Machine) else machine
         rule = rule.id if isinstance(rule, dto.FirewallRule) else rule
         self._connection.network.security_group_rules.delete(rule)
+        self.invalidate_security_groups()
         return self.fetch_firewall_rules_for_machine(machine)
 
+    #: The floating IP fields used by the provider when listing floating IPs
+    _FLOATINGIP_FIELDS = ("floating_ip_address", "floating_network_id", "port_id")
+    #: The maximum number of port IDs to filter by in a single request
+    #: This keeps the URL within the limits imposed by web servers and proxies
+    _PORT_BATCH_SIZE = 50
+
     def _from_api_floatingip(self, api_floatingip, ports=None):
         """
         Converts an OpenStack API floatingip object into a :py:class:`.dto.ExternalIp`.
         """
         if api_floatingip.port_id:
-            if ports:
-                port = ports[api_floatingip.port_id]
-            else:
+            # Fall back to fetching the port if it was not given
+            port = (ports or {}).get(api_floatingip.port_id)
+            if not port:
                 port = self._connection.network.ports.get(api_floatingip.port_id)
         else:
             port = None
@@ -1273,17 +2092,25 @@ class ScopedSession(base.ScopedSession):
         # Only consider FIPs on the specified external network
         extnet = self._external_network()
         fips = list(
-            self._connection.network.floatingips.all(floating_network_id=extnet.id)
+            self._connection.network.floatingips.all(
+                floating_network_id=extnet.id, fields=self._FLOATINGIP_FIELDS
+            )
         )
         self._log("Found %s floating ips", len(fips))
-        # If any floating IPs were found, fetch all the ports in one go and index them
-        # by ID so we can locate the attached machines without making one request per
-        # port
-        if fips:
-            self._log("Fetching ports")
-            ports = {p.id: p for p in self._connection.network.ports.all()}
-        else:
-            ports = {}
+        # Fetch only the ports that the floating IPs are attached to, in batches, and
+        # index them by ID so we can locate the attached machines without making one
+        # request per port
+        port_ids = list(dict.fromkeys(fip.port_id for fip in fips if fip.port_id))
+        ports = {}
+        if port_ids:
+            self._log("Fetching %s ports", len(port_ids))
+        for i in range(0, len(port_ids), self._PORT_BATCH_SIZE):
+            ports.update(
+                (p.id, p)
+                for p in self._connection.network.ports.all(
+                    id=port_ids[i : i + self._PORT_BATCH_SIZE], fields=["device_id"]
+                )
+            )
         return tuple(self._from_api_floatingip(fip, ports) for fip in fips)
 
     @convert_exceptions
@@ -1322,7 +2149,9 @@ class ScopedSession(base.ScopedSession):
         # Only consider FIPs on the correct network
         extnet = self._external_network()
         fips = self._connection.network.floatingips.all(
-            floating_network_id=extnet.id, floating_ip_address=ip_address
+            floating_network_id=extnet.id,
+            floating_ip_address=ip_address,
+            fields=self._FLOATINGIP_FIELDS,
         )
         try:
             return self._from_api_floatingip(next(fips))
@@ -1345,7 +2174,7 @@ class ScopedSession(base.ScopedSession):
         if tenant_network:
             port = next(
                 self._connection.network.ports.all(
-                    device_id=machine, network_id=tenant_network.id
+                    device_id=machine, network_id=tenant_network.id, fields=["id"]
                 ),
                 None,
             )
@@ -1361,7 +2190,10 @@ class ScopedSession(base.ScopedSession):
             current._update(port_id=None)
         # Find the floating IP instance and associate the floating IP with the port
         fip = self._connection.network.floatingips.get(ip.id)
-        return self._from_api_floatingip(fip._update(port_id=port.id))
+        fip = fip._update(port_id=port.id)
+        # Associating a floating IP does not change the updated time of the server
+        self.invalidate_machines()
+        return self._from_api_floatingip(fip)
 
     @convert_exceptions
     def detach_external_ip(self, ip):
@@ -1372,7 +2204,10 @@ class ScopedSession(base.ScopedSession):
         self._log("Detaching floating ip '%s'", ip)
         # Remove any association for the floating IP
         fip = self._connection.network.floatingips.get(ip)
-        return self._from_api_floatingip(fip._update(port_id=None))
+        fip = fip._update(port_id=None)
+        # Disassociating a floating IP does not change the updated time of the server
+        self.invalidate_machines()
+        return self._from_api_floatingip(fip)
 
     _VOLUME_STATUSES = {  # noqa: RUF012
         "creating": dto.VolumeStatus.CREATING,
@@ -1476,6 +2311,8 @@ class ScopedSession(base.ScopedSession):
         self._log("Attaching volume '%s' to server '%s'", volume.id, machine)
         server = self._connection.compute.servers.get(machine)
         server.volume_attachments.create(volume_id=volume.id)
+        # Attaching a volume does not change the updated time of the server
+        self.invalidate_machines()
         # Refresh the volume in the cache
         self._connection.block_store.volumes.get(volume.id, force=True)
         return self.find_volume(volume.id)
@@ -1494,6 +2331,8 @@ class ScopedSession(base.ScopedSession):
         server.volume_attachments.find_by_volume_id(
             volume.id, as_params=False
         )._delete()
+        # Detaching a volume does not change the updated time of the server
+        self.invalidate_machines()
         # Refresh the volume in the cache
         self._connection.block_store.volumes.get(volume.id, force=True)
         return self.find_volume(volume.id)
@@ -1637,6 +2476,9 @@ class ScopedSession(base.ScopedSession):
         """
         # Make sure the underlying api connection is closed
         self._connection.close()
+        # Release the worker threads if the executor is not shared
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
 
 
 def parse_time_and_correct_tz(time_str, tz):
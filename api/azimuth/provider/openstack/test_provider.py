@@ -0,0 +1,245 @@
+import threading
+from unittest import TestCase
+
+import rackit
+from azimuth_auth.session import dto as auth_dto
+
+from .. import dto, errors  # noqa: TID252
+from .provider import ScopedSession
+
+
+def not_found():
+    # Avoid depending on how rackit builds errors from responses
+    return rackit.NotFound.__new__(rackit.NotFound)
+
+
+class FakeCache:
+    """
+    In-memory cache with the same interface as the OpenStack provider cache.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def enabled(self, kind):
+        return True
+
+    def get(self, scope, kind, default=None):
+        return self.values.get((scope, kind), default)
+
+    def set(self, scope, kind, value, ttl=None):
+        self.values[(scope, kind)] = value
+
+    def invalidate(self, scope, *kinds):
+        for kind in kinds:
+            self.values.pop((scope, kind), None)
+
+
+class FakeServer:
+    """
+    Fake Nova server whose console log can be appended to.
+    """
+
+    def __init__(self, id, lines=(), error=None):  # noqa: A002
+        self.id = id
+        self.name = id
+        self.image = {"id": "image-id"}
+        self.status = "ACTIVE"
+        self.fault = {}
+        self.task_state = None
+        self.power_state = 1
+        self.addresses = {}
+        self.attached_volumes = []
+        self.metadata = {}
+        self.user_id = "user-id"
+        self.created = "2024-01-01T00:00:00Z"
+        self.lines = list(lines)
+        self.error = error
+        # Set to make actions on the server block until it is cleared
+        self.released = threading.Event()
+        self.released.set()
+
+    def logs(self, length=None):
+        lines = self.lines[-length:] if length else self.lines
+        return "".join(f"{line}\n" for line in lines)
+
+    def _action(self, status):
+        self.released.wait()
+        if self.error:
+            raise self.error
+        self.status = status
+
+    def start(self):
+        self._action("ACTIVE")
+
+    def stop(self):
+        self._action("SHUTOFF")
+
+    def reboot(self, reboot_type):
+        self._action("REBOOT")
+
+
+class FakeServers:
+    def __init__(self):
+        self.servers = {}
+
+    def get(self, id):  # noqa: A002
+        try:
+            return self.servers[id]
+        except KeyError:
+            raise not_found()
+
+    def delete(self, id):  # noqa: A002
+        self.get(id)._action("DELETED")
+        del self.servers[id]
+
+
+class FakeFlavors:
+    def all(self):
+        return []
+
+
+class FakeCompute:
+    def __init__(self):
+        self.flavors = FakeFlavors()
+        self.servers = FakeServers()
+
+
+class FakePorts:
+    def all(self, **params):
+        return []
+
+
+class FakeSecurityGroups:
+    def find_by_name(self, name):
+        return None
+
+
+class FakeNetwork:
+    def __init__(self):
+        self.ports = FakePorts()
+        self.security_groups = FakeSecurityGroups()
+
+
+class FakeConnection:
+    project_id = "project-id"
+
+    def __init__(self):
+        self.compute = FakeCompute()
+        self.network = FakeNetwork()
+
+    def add_server(self, id, **kwargs):  # noqa: A002
+        server = FakeServer(id, **kwargs)
+        self.compute.servers.servers[id] = server
+        return server
+
+    def close(self):
+        pass
+
+
+class ScopedSessionTestCase(TestCase):
+    def setUp(self):
+        self.connection = FakeConnection()
+        self.session = ScopedSession(
+            auth_dto.User("user-id", "user", "user@example.com"),
+            dto.Tenancy("project-id", "project"),
+            self.connection,
+            cache=FakeCache(),
+        )
+        self.addCleanup(self.session.close)
+
+
+class ConsoleLogsTestCase(ScopedSessionTestCase):
+    def add_server(self, lines):
+        return self.connection.add_server("server-id", lines=lines)
+
+    def test_appended_lines(self):
+        server = self.add_server(["boot", "login:"])
+        logs = self.session.tail_logs_for_machine("server-id")
+        self.assertEqual(logs, dto.MachineLogs(["boot", "login:"], 2, True))
+        server.lines.extend(["one", "two"])
+        logs = self.session.tail_logs_for_machine("server-id", offset=logs.offset)
+        self.assertEqual(logs, dto.MachineLogs(["one", "two"], 4, False))
+
+    def test_appended_lines_repeat_the_anchor(self):
+        server = self.add_server(["boot", "", ""])
+        logs = self.session.tail_logs_for_machine("server-id")
+        server.lines.extend(["", ""])
+        logs = self.session.tail_logs_for_machine("server-id", offset=logs.offset)
+        self.assertEqual(logs, dto.MachineLogs(["", ""], 5, False))
+        server.lines.extend(["login:", ""])
+        logs = self.session.tail_logs_for_machine("server-id", offset=logs.offset)
+        self.assertEqual(logs, dto.MachineLogs(["login:", ""], 7, False))
+
+    def test_unchanged_log(self):
+        self.add_server(["boot", "", "", "", ""])
+        logs = self.session.tail_logs_for_machine("server-id")
+        for _ in range(2):
+            logs = self.session.tail_logs_for_machine("server-id", offset=logs.offset)
+            self.assertEqual(logs, dto.MachineLogs([], 5, False))
+
+    def test_ambiguous_anchor_in_partial_tail_resets(self):
+        server = self.add_server(["boot", "", ""])
+        logs = self.session.tail_logs_for_machine("server-id", limit=2)
+        self.assertEqual(logs, dto.MachineLogs(["", ""], 2, True))
+        # Only the last lines are known, so blank lines can't be told apart
+        server.lines.extend(["", ""])
+        logs = self.session.tail_logs_for_machine(
+            "server-id", limit=2, offset=logs.offset
+        )
+        self.assertEqual(logs, dto.MachineLogs(["", ""], 2, True))
+
+    def test_unique_anchor_in_partial_tail(self):
+        server = self.add_server(["boot", "one", "two"])
+        logs = self.session.tail_logs_for_machine("server-id", limit=2)
+        server.lines.append("three")
+        logs = self.session.tail_logs_for_machine(
+            "server-id", limit=2, offset=logs.offset
+        )
+        self.assertEqual(logs, dto.MachineLogs(["three"], 3, False))
+
+    def test_replaced_log_resets(self):
+        server = self.add_server(["boot", "one", "two"])
+        logs = self.session.tail_logs_for_machine("server-id")
+        server.lines = ["reboot"]
+        logs = self.session.tail_logs_for_machine("server-id", offset=logs.offset)
+        self.assertEqual(logs, dto.MachineLogs(["reboot"], 1, True))
+
+    def test_unknown_offset_resets(self):
+        self.add_server(["boot"])
+        logs = self.session.tail_logs_for_machine("server-id", offset=10)
+        self.assertEqual(logs, dto.MachineLogs(["boot"], 1, True))
+
+
+class BulkMachineActionTestCase(ScopedSessionTestCase):
+    def test_results_are_in_input_order(self):
+        servers = [self.connection.add_server(m) for m in ["one", "two", "three"]]
+        # Make the first action finish last
+        servers[0].released.clear()
+        threading.Timer(0.1, servers[0].released.set).start()
+        results = self.session.bulk_machine_action(
+            dto.MachineAction.STOP, ["one", "two", "three"]
+        )
+        self.assertEqual([r.machine_id for r in results], ["one", "two", "three"])
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.machine.status.name, "SHUTOFF")
+
+    def test_failing_machine_does_not_fail_the_others(self):
+        self.connection.add_server("one")
+        self.connection.add_server(
+            "two", error=errors.InvalidOperationError("Machine is locked.")
+        )
+        results = self.session.bulk_machine_action(
+            dto.MachineAction.START, ["one", "two"]
+        )
+        self.assertEqual(results[0].machine.id, "one")
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].machine)
+        self.assertIsInstance(results[1].error, errors.InvalidOperationError)
+
+    def test_deleted_machine_is_gone(self):
+        self.connection.add_server("one")
+        results = self.session.bulk_machine_action(dto.MachineAction.DELETE, ["one"])
+        self.assertEqual(results, [dto.MachineActionResult("one", None)])
+        self.assertEqual(self.connection.compute.servers.servers, {})
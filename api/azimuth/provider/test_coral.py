@@ -0,0 +1,132 @@
+import http.server
+import json
+import threading
+import urllib.parse
+from unittest import TestCase
+
+import requests
+
+from . import coral
+
+ACCOUNTS = [
+    {"account": "acct-1", "project_id": "0b3f8b1e-6a4f-4c8e-9d2a-3b7c1e5f9a01"},
+    {"account": "acct-2", "project_id": "5c2d9e7a-1b3f-4a6e-8c0d-2f4b6a8c0e12"},
+]
+
+ALLOCATIONS = [
+    {"id": 1, "account": "acct-1", "start": "2024-01-01", "end": "2099-01-01"},
+    {"id": 2, "account": "acct-2", "start": "2024-01-01", "end": "2099-01-01"},
+]
+
+
+class FakeCoralHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Request handler for a fake Coral server that supports server-side filtering.
+    """
+
+    # Keep connections alive so that the client can reuse them
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        self.server.requests.append((url.path, params, self.headers["Authorization"]))
+        if url.path == "/resource_provider_account":
+            body = [
+                a
+                for a in ACCOUNTS
+                if "project_id" not in params or a["project_id"] == params["project_id"]
+            ]
+        elif url.path == "/allocation":
+            body = [
+                a
+                for a in ALLOCATIONS
+                if "account" not in params or a["account"] == params["account"]
+            ]
+        elif url.path == "/allocation/1/resources":
+            body = [{"resource_class": {"name": "VCPU"}, "resource_hours": 100}]
+        elif url.path == "/allocation/2/resources":
+            # Simulate a Coral server that hangs until the test is finished
+            self.server.release.wait()
+            body = []
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class FakeCache:
+    """
+    In-memory cache with the same interface as the OpenStack provider cache.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, scope, kind, default=None):
+        return self.values.get((scope, kind), default)
+
+    def set(self, scope, kind, value, ttl=None):
+        self.values[(scope, kind)] = value
+
+
+class CoralClientTestCase(TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), FakeCoralHandler
+        )
+        self.server.requests = []
+        self.server.release = threading.Event()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(self.server.release.set)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def test_accounts_filtered_by_project(self):
+        client = coral.Client(self.base_url, "token")
+        accounts = client.accounts("0b3f8b1e6a4f4c8e9d2a3b7c1e5f9a01")
+        self.assertEqual([a["account"] for a in accounts], ["acct-1"])
+        path, params, auth = self.server.requests[0]
+        self.assertEqual(path, "/resource_provider_account")
+        self.assertEqual(params, {"project_id": "0b3f8b1e-6a4f-4c8e-9d2a-3b7c1e5f9a01"})
+        self.assertEqual(auth, "Bearer token")
+
+    def test_allocations_filtered_by_account(self):
+        client = coral.Client(self.base_url, "token")
+        allocations = client.allocations("acct-2")
+        self.assertEqual([a["id"] for a in allocations], [2])
+        self.assertEqual(self.server.requests[0][1], {"account": "acct-2"})
+
+    def test_accounts_and_allocations_are_cached(self):
+        client = coral.Client(self.base_url, "token", cache=FakeCache())
+        for _ in range(3):
+            client.accounts("0b3f8b1e6a4f4c8e9d2a3b7c1e5f9a01")
+            client.allocations("acct-1")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_allocation_resources_are_not_cached(self):
+        client = coral.Client(self.base_url, "token", cache=FakeCache())
+        for _ in range(2):
+            resources = client.allocation_resources(1)
+        self.assertEqual(resources[0]["resource_hours"], 100)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_errors_are_raised(self):
+        client = coral.Client(self.base_url, "token")
+        with self.assertRaises(requests.HTTPError):
+            client.allocation_resources(99)
+
+    def test_timeout_is_applied(self):
+        client = coral.Client(self.base_url, "token", timeout=0.2)
+        with self.assertRaises(requests.Timeout):
+            client.allocation_resources(2)
@@ -0,0 +1,54 @@
+import dataclasses
+import datetime
+import pickle
+from unittest import TestCase
+
+from . import dto
+
+
+class DTOTestCase(TestCase):
+    def make_machine(self):
+        return dto.Machine(
+            "machine-id",
+            "machine",
+            "image-id",
+            "size-id",
+            dto.MachineStatus(dto.MachineStatusType.ACTIVE, "ACTIVE", None),
+            "Running",
+            None,
+            "192.168.3.10",
+            None,
+            ("volume-id",),
+            {"key": "value"},
+            "user",
+            datetime.datetime.now(datetime.timezone.utc),
+        )
+
+    # Check that the DTOs do not have a per-instance dict
+    def test_dtos_are_slotted(self):
+        for name in dir(dto):
+            obj = getattr(dto, name)
+            if isinstance(obj, type) and dataclasses.is_dataclass(obj):
+                with self.subTest(dto=name):
+                    self.assertIn("__slots__", vars(obj))
+                    self.assertNotIn("__dict__", vars(obj))
+
+    # Check that DTOs can be pickled, as required to store them in a cache
+    def test_pickle_round_trip(self):
+        machine = self.make_machine()
+        self.assertEqual(pickle.loads(pickle.dumps(machine)), machine)
+
+    # Check that the DTOs are still immutable
+    def test_frozen(self):
+        machine = self.make_machine()
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            machine.name = "other"
+        self.assertEqual(dataclasses.replace(machine, name="other").name, "other")
+
+    # Check that the fields used by the serializers are unchanged
+    def test_asdict(self):
+        machine = self.make_machine()
+        data = dataclasses.asdict(machine)
+        self.assertEqual(list(data), [f.name for f in dataclasses.fields(dto.Machine)])
+        self.assertEqual(data["status"]["name"], "ACTIVE")
+        self.assertEqual(data["metadata"], {"key": "value"})
@@ -12,7 +12,7 @@ import jsonschema
 from cryptography.exceptions import UnsupportedAlgorithm
 from cryptography.hazmat.primitives.serialization import load_ssh_public_key
 from django.urls import reverse
-from rest_framework import serializers
+from rest_framework import serializers, status
 
 from .apps import dto as apps_dto
 from .cluster_api import dto as capi_dto
@@ -52,6 +52,45 @@ def make_dto_serializer(dto_class, exclude=[]):
 ID_REGEX = "^[-a-zA-Z0-9_.]+$"
 
 
+#: The codes and HTTP statuses for provider errors, in the order they should be checked
+#: The codes for authentication, permission and not found errors match the codes used
+#: by the equivalent REST framework exceptions
+PROVIDER_ERROR_CODES = (
+    (
+        errors.UnsupportedOperationError,
+        "unsupported_operation",
+        status.HTTP_404_NOT_FOUND,
+    ),
+    (errors.QuotaExceededError, "quota_exceeded", status.HTTP_409_CONFLICT),
+    (errors.InvalidOperationError, "invalid_operation", status.HTTP_409_CONFLICT),
+    (errors.BadInputError, "bad_input", status.HTTP_400_BAD_REQUEST),
+    (
+        errors.OperationTimedOutError,
+        "operation_timed_out",
+        status.HTTP_504_GATEWAY_TIMEOUT,
+    ),
+    (errors.AuthenticationError, "authentication_failed", status.HTTP_401_UNAUTHORIZED),
+    (errors.PermissionDeniedError, "permission_denied", status.HTTP_403_FORBIDDEN),
+    (errors.ObjectNotFoundError, "not_found", status.HTTP_404_NOT_FOUND),
+)
+
+
+def provider_error_code(exc):
+    """
+    Returns a tuple of (code, HTTP status) for the given provider error.
+
+    Unexpected errors have no code and an internal server error status.
+    """
+    return next(
+        (
+            (code, status_code)
+            for klass, code, status_code in PROVIDER_ERROR_CODES
+            if isinstance(exc, klass)
+        ),
+        (None, status.HTTP_500_INTERNAL_SERVER_ERROR),
+    )
+
+
 Ref = collections.namedtuple("Ref", ["id"])
 
 
@@ -429,6 +468,41 @@ class CreateMachineSerializer(serializers.Serializer):
     size_id = serializers.RegexField(ID_REGEX, write_only=True)
 
 
+class MachineActionSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(
+        choices=[a.name for a in dto.MachineAction], write_only=True
+    )
+    machine_ids = serializers.ListField(
+        child=serializers.RegexField(ID_REGEX),
+        min_length=1,
+        max_length=100,
+        write_only=True,
+    )
+
+    def validate_action(self, value):
+        """
+        Converts a string action into an enum member.
+        """
+        return dto.MachineAction[value]
+
+
+class MachineActionResultSerializer(serializers.Serializer):
+    id = serializers.ReadOnlyField(source="machine_id")
+    machine = MachineSerializer(read_only=True, allow_null=True)
+    error = serializers.SerializerMethodField()
+
+    def get_error(self, obj):
+        if not obj.error:
+            return None
+        code, _ = provider_error_code(obj.error)
+        return {"detail": str(obj.error), "code": code}
+
+
+class MachineLogsQuerySerializer(serializers.Serializer):
+    tail = serializers.IntegerField(min_value=1, required=False)
+    offset = serializers.IntegerField(min_value=0, required=False)
+
+
 class FirewallRuleSerializer(
     make_dto_serializer(dto.FirewallRule, exclude=["direction", "protocol"])
 ):
@@ -222,6 +222,11 @@ class SchedulingSettings(SettingsObject):
 class CoralCreditsSetting(SettingsObject):
     TOKEN = Setting(default=None)
     CORAL_URI = Setting(default=None)
+    #: The timeout in seconds for requests to Coral
+    #: If Coral does not respond in time, fetching the quotas for a tenancy fails
+    TIMEOUT = Setting(default=10)
+    #: The number of seconds to cache the accounts and allocations from Coral for
+    CACHE_TTL = Setting(default=60)
 
 
 class AzimuthSettings(SettingsObject):
@@ -0,0 +1,84 @@
+import datetime
+from unittest import TestCase
+
+import django
+from django.conf import settings
+
+from . import serializers
+from .provider import dto, errors
+
+
+def setUpModule():
+    # The serializers only need the default settings
+    if not settings.configured:
+        settings.configure()
+        django.setup()
+
+
+def make_machine(id):  # noqa: A002
+    return dto.Machine(
+        id,
+        id,
+        "image-id",
+        "size-id",
+        dto.MachineStatus(dto.MachineStatusType.ACTIVE, "ACTIVE", None),
+        "Running",
+        None,
+        "192.168.3.10",
+        None,
+        (),
+        {},
+        "user",
+        datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+
+
+class MachineActionSerializerTestCase(TestCase):
+    def validate(self, data):
+        serializer = serializers.MachineActionSerializer(data=data)
+        serializer.is_valid()
+        return serializer
+
+    def test_valid(self):
+        serializer = self.validate({"action": "STOP", "machine_ids": ["one", "two"]})
+        self.assertEqual(
+            serializer.validated_data,
+            {"action": dto.MachineAction.STOP, "machine_ids": ["one", "two"]},
+        )
+
+    def test_unknown_action(self):
+        serializer = self.validate({"action": "EXPLODE", "machine_ids": ["one"]})
+        self.assertEqual(list(serializer.errors), ["action"])
+
+    def test_too_many_machines(self):
+        machine_ids = [f"machine-{i}" for i in range(101)]
+        serializer = self.validate({"action": "STOP", "machine_ids": machine_ids})
+        self.assertEqual(serializer.errors["machine_ids"][0].code, "max_length")
+
+    def test_no_machines(self):
+        serializer = self.validate({"action": "STOP", "machine_ids": []})
+        self.assertEqual(list(serializer.errors), ["machine_ids"])
+
+
+class MachineActionResultSerializerTestCase(TestCase):
+    def test_results(self):
+        results = [
+            dto.MachineActionResult("one", make_machine("one")),
+            dto.MachineActionResult(
+                "two", None, errors.InvalidOperationError("Machine is locked.")
+            ),
+            dto.MachineActionResult("three", None),
+            dto.MachineActionResult("four", None, RuntimeError("Unexpected")),
+        ]
+        data = serializers.MachineActionResultSerializer(results, many=True).data
+        self.assertEqual([item["id"] for item in data], ["one", "two", "three", "four"])
+        self.assertEqual(data[0]["machine"]["id"], "one")
+        self.assertIsNone(data[0]["error"])
+        self.assertIsNone(data[1]["machine"])
+        self.assertEqual(
+            data[1]["error"],
+            {"detail": "Machine is locked.", "code": "invalid_operation"},
+        )
+        # A deleted machine that has gone has no machine and no error
+        self.assertEqual(data[2], {"id": "three", "machine": None, "error": None})
+        self.assertEqual(data[3]["error"], {"detail": "Unexpected", "code": None})
@@ -88,6 +88,11 @@ urlpatterns = [
                     include(
                         [
                             path("", views.machines, name="machines"),
+                            path(
+                                "actions/",
+                                views.machines_action,
+                                name="machines_action",
+                            ),
                             path(
                                 "<id:machine>/",
                                 include(
@@ -60,33 +60,6 @@ def convert_provider_exceptions(view):
     def wrapper(*args, **kwargs):
         try:
             return view(*args, **kwargs)
-        # For provider errors that don't map to authentication/not found errors,
-        # return suitable responses
-        except provider_errors.UnsupportedOperationError as exc:
-            return response.Response(
-                {"detail": str(exc), "code": "unsupported_operation"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        except provider_errors.QuotaExceededError as exc:
-            return response.Response(
-                {"detail": str(exc), "code": "quota_exceeded"},
-                status=status.HTTP_409_CONFLICT,
-            )
-        except provider_errors.InvalidOperationError as exc:
-            return response.Response(
-                {"detail": str(exc), "code": "invalid_operation"},
-                status=status.HTTP_409_CONFLICT,
-            )
-        except provider_errors.BadInputError as exc:
-            return response.Response(
-                {"detail": str(exc), "code": "bad_input"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        except provider_errors.OperationTimedOutError as exc:
-            return response.Response(
-                {"detail": str(exc), "code": "operation_timed_out"},
-                status=status.HTTP_504_GATEWAY_TIMEOUT,
-            )
         # For authentication/not found errors, raise the DRF equivalent
         except provider_errors.AuthenticationError as exc:
             raise drf_exceptions.AuthenticationFailed(str(exc))
@@ -94,11 +67,15 @@ def convert_provider_exceptions(view):
             raise drf_exceptions.PermissionDenied(str(exc))
         except provider_errors.ObjectNotFoundError as exc:
             raise drf_exceptions.NotFound(str(exc))
+        # For other provider errors, return suitable responses
         except provider_errors.Error as exc:
+            code, status_code = serializers.provider_error_code(exc)
+            if code:
+                return response.Response(
+                    {"detail": str(exc), "code": code}, status=status_code
+                )
             log.exception("Unexpected provider error")
-            return response.Response(
-                {"detail": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            return response.Response({"detail": str(exc)}, status=status_code)
 
     return wrapper
 
@@ -718,6 +695,43 @@ def machines(request, tenant):
             return response.Response(serializer.data)
 
 
+@provider_api_view(["POST"])
+def machines_action(request, tenant):
+    """
+    Perform an action on several machines at once. The request body should look
+    like::
+
+        {
+            "action": "STOP",
+            "machine_ids": ["<id of machine>", "<id of machine>"]
+        }
+
+    The action must be one of ``START``, ``STOP``, ``RESTART`` or ``DELETE``.
+
+    The response contains a result for each machine, with either the updated machine
+    or the error that occurred for that machine.
+    """
+    input_serializer = serializers.MachineActionSerializer(data=request.data)
+    input_serializer.is_valid(raise_exception=True)
+    with request.auth.scoped_session(tenant) as session:
+        if not session.capabilities().supports_machines:
+            return response.Response(
+                {
+                    "detail": "Machine support has been disabled by the administrator.",
+                    "code": "unsupported_operation",
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        results = session.bulk_machine_action(
+            input_serializer.validated_data["action"],
+            input_serializer.validated_data["machine_ids"],
+        )
+        output_serializer = serializers.MachineActionResultSerializer(
+            results, many=True, context={"request": request, "tenant": tenant}
+        )
+    return response.Response(output_serializer.data)
+
+
 @provider_api_view(["GET", "DELETE"])
 def machine_details(request, tenant, machine):
     """
@@ -756,7 +770,19 @@ def machine_details(request, tenant, machine):
 def machine_logs(request, tenant, machine):
     """
     Return the logs for the specified machine as a list of lines.
+
+    The ``tail`` query parameter can be given to return at most that number of
+    lines from the end of the log.
+
+    The response also contains an ``offset``. When this is given as the ``offset``
+    query parameter in a subsequent request, only the lines that follow the lines
+    that were previously returned are returned. If the lines cannot follow on from
+    the offset, e.g. because the log has been truncated, the tail of the log is
+    returned and ``reset`` is set in the response to indicate that the lines
+    replace any lines that were previously returned.
     """
+    input_serializer = serializers.MachineLogsQuerySerializer(data=request.query_params)
+    input_serializer.is_valid(raise_exception=True)
     with request.auth.scoped_session(tenant) as session:
         if not session.capabilities().supports_machines:
             return response.Response(
@@ -766,8 +792,18 @@ def machine_logs(request, tenant, machine):
                 },
                 status=status.HTTP_404_NOT_FOUND,
             )
-        machine_logs = session.fetch_logs_for_machine(machine)
-    return response.Response(dict(logs=machine_logs))
+        machine_logs = session.tail_logs_for_machine(
+            machine,
+            input_serializer.validated_data.get("tail"),
+            input_serializer.validated_data.get("offset"),
+        )
+    return response.Response(
+        dict(
+            logs=machine_logs.lines,
+            offset=machine_logs.offset,
+            reset=machine_logs.reset,
+        )
+    )
 
 
 @provider_api_view(["GET", "POST"])
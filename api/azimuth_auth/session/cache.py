@@ -0,0 +1,98 @@
+"""
+Module containing helpers for caching data derived from tokens between requests.
+"""
+
+import datetime
+import hashlib
+
+import dateutil.parser
+from django.core.cache import caches
+
+
+class TokenCache:
+    """
+    Cache for data derived from a token, e.g. the result of validating it.
+
+    Entries are keyed by a hash of the token, so the token itself is never used as a
+    cache key, and are stored in the configured Django cache. This means they are
+    shared between all the threads in a process and, if a shared cache backend is
+    configured, between processes.
+
+    Args:
+        alias: The alias of the Django cache to use.
+        key_prefix: The prefix for all keys stored by this cache.
+        ttl: The maximum number of seconds to cache data for. Data is never cached
+             beyond the expiry of the token. A TTL of zero disables the cache.
+        invalid_ttl: The number of seconds to remember that a token is invalid for.
+    """
+
+    #: The number of seconds before the expiry of a token that cached data expires
+    #: This avoids handing out tokens that are about to expire
+    EXPIRY_MARGIN = 30
+
+    def __init__(
+        self, alias="default", key_prefix="azimuth_auth", ttl=0, invalid_ttl=0
+    ):
+        self._alias = alias
+        self._key_prefix = key_prefix
+        self._ttl = int(ttl)
+        self._invalid_ttl = int(invalid_ttl)
+
+    @property
+    def _cache(self):
+        # Django cache instances are thread-local, so look it up every time
+        return caches[self._alias]
+
+    def _key(self, token, *parts):
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        return ":".join([self._key_prefix, token_hash, *parts])
+
+    def _timeout(self, expires_at):
+        """
+        Returns the timeout to use for data for a token with the given expiry, which
+        can be a datetime, an ISO 8601 string or a UNIX timestamp.
+        """
+        if not expires_at:
+            return self._ttl
+        if isinstance(expires_at, str):
+            expires_at = dateutil.parser.isoparse(expires_at)
+        elif isinstance(expires_at, int | float):
+            # OAuth2 token data has the expiry as a timestamp
+            expires_at = datetime.datetime.fromtimestamp(
+                expires_at, datetime.timezone.utc
+            )
+        now = datetime.datetime.now(datetime.timezone.utc)
+        remaining = int((expires_at - now).total_seconds()) - self.EXPIRY_MARGIN
+        return min(self._ttl, remaining)
+
+    def get(self, token, *parts):
+        """
+        Returns the cached data for the token.
+
+        If the token is known to be invalid, ``False`` is returned. If there is no
+        cached data for the token, ``None`` is returned.
+        """
+        if self._ttl <= 0 and self._invalid_ttl <= 0:
+            return None
+        return self._cache.get(self._key(token, *parts))
+
+    def set(self, token, data, *parts, expires_at=None):
+        """
+        Caches the data for the token, limited by the expiry of the token if given.
+        """
+        timeout = self._timeout(expires_at)
+        if timeout > 0:
+            self._cache.set(self._key(token, *parts), data, timeout)
+
+    def set_invalid(self, token, *parts):
+        """
+        Records that the token is invalid.
+        """
+        if self._invalid_ttl > 0:
+            self._cache.set(self._key(token, *parts), False, self._invalid_ttl)
+
+    def invalidate(self, token, *parts):
+        """
+        Removes any cached data for the token.
+        """
+        self._cache.delete(self._key(token, *parts))
@@ -37,3 +37,6 @@ class Credential:
     provider: str
     #: The credential data, which will depend on the provider
     data: str
+    #: The token data for the credential, if the auth session has already validated it
+    #: This allows providers to avoid validating the token again
+    token_data: dict | None = dataclasses.field(default=None, compare=False)
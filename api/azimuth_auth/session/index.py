@@ -0,0 +1,298 @@
+"""
+Module containing in-process indexes of Kubernetes resources that are kept up to date
+using watches.
+"""
+
+import logging
+import threading
+import time
+
+import easykube
+
+logger = logging.getLogger(__name__)
+
+
+class WatchIndex:
+    """
+    Base class for an in-memory index of Kubernetes resources that is maintained by a
+    watch.
+
+    The watch runs in a daemon thread that is started on first use. Until the initial
+    state has been loaded, and whenever the watch has failed and is being restarted,
+    the index is not ready and callers should query the Kubernetes API directly.
+
+    Subclasses must implement :py:meth:`_watch_list`, :py:meth:`_clear`,
+    :py:meth:`_add` and :py:meth:`_remove`, which are called with the lock held.
+    """
+
+    #: The name of the thread that runs the watch
+    THREAD_NAME = "azimuth-watch-index"
+    #: The maximum number of seconds to wait for the initial state on first use
+    INITIAL_SYNC_TIMEOUT = 5
+    #: The number of seconds to wait before restarting a failed watch
+    RESTART_DELAY = 5
+
+    def __init__(self, ekclient):
+        self._ekclient = ekclient
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready = threading.Event()
+
+    def _watch_list(self):
+        """
+        Starts the watch and returns a tuple of (initial state, events).
+        """
+        raise NotImplementedError
+
+    def _clear(self):
+        """
+        Removes all the objects from the index.
+        """
+        raise NotImplementedError
+
+    def _add(self, obj):
+        """
+        Adds the object to the index, replacing any existing version of it.
+        """
+        raise NotImplementedError
+
+    def _remove(self, obj):
+        """
+        Removes the object from the index.
+        """
+        raise NotImplementedError
+
+    def _reset(self, objs):
+        with self._lock:
+            self._clear()
+            for obj in objs:
+                self._add(obj)
+
+    def _watch(self):
+        while True:
+            try:
+                initial_state, events = self._watch_list()
+                self._reset(initial_state)
+                self._ready.set()
+                logger.info("[%s] loaded initial state", self.THREAD_NAME)
+                for event in events:
+                    with self._lock:
+                        if event["type"] == "DELETED":
+                            self._remove(event["object"])
+                        else:
+                            self._add(event["object"])
+            except Exception:
+                logger.exception("[%s] error watching resources", self.THREAD_NAME)
+            # Until the watch is restarted, we can't be sure the index is up to date
+            self._ready.clear()
+            time.sleep(self.RESTART_DELAY)
+
+    def ready(self):
+        """
+        Returns ``True`` if the index is up to date, starting the watch if required.
+        """
+        with self._lock:
+            starting = self._thread is None
+            if starting:
+                self._thread = threading.Thread(
+                    target=self._watch, name=self.THREAD_NAME, daemon=True
+                )
+                self._thread.start()
+        # Only wait for the initial state when the watch is first started
+        if starting:
+            return self._ready.wait(self.INITIAL_SYNC_TIMEOUT)
+        else:
+            return self._ready.is_set()
+
+
+class TenancyNamespaceIndex(WatchIndex):
+    """
+    Index of the tenancy namespaces in the cluster, maintained by a Kubernetes watch.
+
+    Namespaces are indexed by tenancy ID and by the OIDC group annotation, so that the
+    tenancies for a user can be found without listing namespaces on every request.
+
+    Args:
+        ekclient: The easykube client to use.
+        id_labels: The labels that contain the tenancy ID, in order of precedence.
+        group_annotation: The annotation that contains the OIDC group.
+    """
+
+    THREAD_NAME = "azimuth-tenancy-index"
+
+    def __init__(self, ekclient, id_labels, group_annotation):
+        super().__init__(ekclient)
+        self._id_labels = id_labels
+        self._group_annotation = group_annotation
+        self._clear()
+
+    def _tenancy_id(self, namespace):
+        labels = namespace["metadata"].get("labels") or {}
+        return next(
+            (labels[label] for label in self._id_labels if labels.get(label)), None
+        )
+
+    def _group(self, namespace):
+        annotations = namespace["metadata"].get("annotations") or {}
+        return annotations.get(self._group_annotation)
+
+    def _watch_list(self):
+        # There is no label selector for "either label", so watch all the namespaces
+        # and keep only the tenancy namespaces
+        return self._ekclient.api("v1").resource("namespaces").watch_list()
+
+    def _clear(self):
+        # The tenancy namespaces indexed by name
+        self._namespaces = {}
+        # Map of tenancy ID -> names of namespaces with that ID
+        self._names_by_id = {}
+        # Map of OIDC group -> tenancy IDs of namespaces with that group
+        self._ids_by_group = {}
+
+    def _remove(self, namespace):
+        name = namespace["metadata"]["name"]
+        namespace = self._namespaces.pop(name, None)
+        if not namespace:
+            return
+        tenancy_id = self._tenancy_id(namespace)
+        names = self._names_by_id.get(tenancy_id, {})
+        names.pop(name, None)
+        if not names:
+            self._names_by_id.pop(tenancy_id, None)
+        group = self._group(namespace)
+        # Only remove the tenancy ID from the group if no other namespace needs it
+        if group and not any(
+            self._group(self._namespaces[other]) == group for other in names
+        ):
+            ids = self._ids_by_group.get(group, set())
+            ids.discard(tenancy_id)
+            if not ids:
+                self._ids_by_group.pop(group, None)
+
+    def _add(self, namespace):
+        name = namespace["metadata"]["name"]
+        self._remove(namespace)
+        tenancy_id = self._tenancy_id(namespace)
+        if not tenancy_id:
+            return
+        # Only keep the parts of the namespace that we need
+        self._namespaces[name] = {
+            "metadata": {
+                "name": name,
+                "labels": namespace["metadata"].get("labels") or {},
+                "annotations": namespace["metadata"].get("annotations") or {},
+            },
+        }
+        self._names_by_id.setdefault(tenancy_id, {})[name] = None
+        group = self._group(namespace)
+        if group:
+            self._ids_by_group.setdefault(group, set()).add(tenancy_id)
+
+    def namespaces(self, tenancy_id):
+        """
+        Returns the namespaces for the given tenancy ID.
+        """
+        with self._lock:
+            names = self._names_by_id.get(tenancy_id, {})
+            return [self._namespaces[name] for name in names]
+
+    def namespaces_by_id(self, groups):
+        """
+        Returns the namespaces for each tenancy ID that has a namespace for one of the
+        given groups, indexed by tenancy ID.
+        """
+        with self._lock:
+            tenancy_ids = {
+                tenancy_id
+                for group in groups
+                for tenancy_id in self._ids_by_group.get(group, ())
+            }
+            return {
+                tenancy_id: [
+                    self._namespaces[name] for name in self._names_by_id[tenancy_id]
+                ]
+                for tenancy_id in tenancy_ids
+            }
+
+
+class CredentialSecretIndex(WatchIndex):
+    """
+    Index of the cloud credential secrets in the cluster, maintained by a Kubernetes
+    watch.
+
+    Secrets are indexed by namespace and provider, so that the credential for a tenancy
+    can be found without listing secrets on every request. Secrets are only re-indexed
+    when their resource version changes.
+
+    Args:
+        ekclient: The easykube client to use.
+        provider_label: The label that contains the provider for a credential secret.
+    """
+
+    THREAD_NAME = "azimuth-credential-index"
+
+    def __init__(self, ekclient, provider_label):
+        super().__init__(ekclient)
+        self._provider_label = provider_label
+        self._clear()
+
+    def _key(self, secret):
+        return secret["metadata"]["namespace"], secret["metadata"]["name"]
+
+    def _watch_list(self):
+        # Only watch the secrets that have the provider label
+        return (
+            self._ekclient.api("v1")
+            .resource("secrets")
+            .watch_list(
+                labels={self._provider_label: easykube.PRESENT}, all_namespaces=True
+            )
+        )
+
+    def _clear(self):
+        # The credential secrets indexed by (namespace, name)
+        self._secrets = {}
+        # Map of (namespace, provider) -> names of secrets for that provider
+        self._names_by_provider = {}
+
+    def _remove(self, secret):
+        namespace, name = key = self._key(secret)
+        secret = self._secrets.pop(key, None)
+        if not secret:
+            return
+        provider_key = (namespace, secret["metadata"]["labels"][self._provider_label])
+        names = self._names_by_provider.get(provider_key, {})
+        names.pop(name, None)
+        if not names:
+            self._names_by_provider.pop(provider_key, None)
+
+    def _add(self, secret):
+        namespace, name = key = self._key(secret)
+        resource_version = secret["metadata"].get("resourceVersion")
+        existing = self._secrets.get(key)
+        if existing and existing["metadata"]["resourceVersion"] == resource_version:
+            return
+        self._remove(secret)
+        labels = secret["metadata"].get("labels") or {}
+        provider = labels.get(self._provider_label)
+        if not provider:
+            return
+        # Only keep the parts of the secret that we need
+        self._secrets[key] = {
+            "metadata": {
+                "name": name,
+                "namespace": namespace,
+                "labels": labels,
+                "resourceVersion": resource_version,
+            },
+            "data": secret.get("data") or {},
+        }
+        self._names_by_provider.setdefault((namespace, provider), {})[name] = None
+
+    def secrets(self, namespace, provider):
+        """
+        Returns the credential secrets in the given namespace for the given provider.
+        """
+        with self._lock:
+            names = self._names_by_provider.get((namespace, provider), {})
+            return [self._secrets[(namespace, name)] for name in names]
@@ -0,0 +1,158 @@
+"""
+Module containing helpers for validating JWT access tokens locally.
+"""
+
+import logging
+import threading
+import time
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSUnavailableError(Exception):
+    """
+    Raised when the JWKS is required to validate a token but cannot be fetched.
+    """
+
+
+class JWTValidator:
+    """
+    Validates JWT access tokens using the keys published by the OIDC issuer.
+
+    The JSON Web Key Set (JWKS) for the issuer is cached in memory and shared by all
+    the threads in the process. It is fetched again once it is older than
+    ``jwks_cache_ttl`` seconds, or when a token is signed with a key that is not in the
+    cached set, e.g. because the issuer has rotated its keys. To avoid tokens with
+    unknown keys causing a request to the issuer every time, the set is fetched at most
+    once every ``MIN_REFRESH_INTERVAL`` seconds for unknown keys. In between, a token
+    with an unknown key raises :py:class:`JWKSUnavailableError`.
+
+    If fetching the JWKS fails, the failure is remembered for ``FAILURE_BACKOFF``
+    seconds, during which the previously fetched keys are used if possible. When the
+    required key is not available, :py:class:`JWKSUnavailableError` is raised without
+    contacting the issuer, so that callers can fall back to another form of validation.
+
+    Args:
+        jwks_url: The URL of the JWKS for the issuer.
+        issuer: The expected issuer of tokens.
+        audience: The expected audience of tokens.
+        algorithms: The signing algorithms that are permitted.
+        verify_ssl: Indicates whether to verify SSL when fetching the JWKS.
+        jwks_cache_ttl: The maximum number of seconds to cache the JWKS for.
+    """
+
+    #: The minimum number of seconds between fetches of the JWKS for unknown keys
+    MIN_REFRESH_INTERVAL = 30
+    #: The number of seconds to wait after a failed fetch before fetching again
+    FAILURE_BACKOFF = 10
+    #: The timeout in seconds for fetching the JWKS
+    FETCH_TIMEOUT = 5
+
+    def __init__(
+        self,
+        jwks_url,
+        issuer,
+        audience,
+        algorithms,
+        verify_ssl=True,
+        jwks_cache_ttl=3600,
+    ):
+        self._jwks_url = jwks_url
+        self._issuer = issuer
+        self._audience = audience
+        self._algorithms = list(algorithms)
+        self._verify_ssl = verify_ssl
+        self._jwks_cache_ttl = int(jwks_cache_ttl)
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._fetched_at = None
+        self._failed_at = None
+
+    def _fetch_keys(self):
+        logger.info("fetching JWKS from '%s'", self._jwks_url)
+        response = httpx.get(
+            self._jwks_url,
+            headers={"Accept": "application/json"},
+            verify=self._verify_ssl,
+            timeout=self.FETCH_TIMEOUT,
+        )
+        response.raise_for_status()
+        # Keys that cannot be used for signature verification are skipped
+        jwk_set = jwt.PyJWKSet.from_dict(response.json())
+        self._keys = {
+            key.key_id: key
+            for key in jwk_set.keys
+            if getattr(key, "public_key_use", None) in {None, "sig"}
+        }
+        self._fetched_at = time.monotonic()
+
+    def _signing_key(self, key_id):
+        """
+        Returns the signing key with the given id, fetching the JWKS if required.
+        """
+        # Holding the lock while fetching means that only one thread fetches the JWKS
+        with self._lock:
+            now = time.monotonic()
+            fetched = False
+            failed = (
+                self._failed_at is not None
+                and now - self._failed_at < self.FAILURE_BACKOFF
+            )
+            if not failed and (
+                self._fetched_at is None
+                or now - self._fetched_at >= self._jwks_cache_ttl
+                or (
+                    key_id not in self._keys
+                    and now - self._fetched_at >= self.MIN_REFRESH_INTERVAL
+                )
+            ):
+                try:
+                    self._fetch_keys()
+                except (httpx.HTTPError, ValueError, jwt.PyJWTError):
+                    logger.exception("failed to fetch JWKS from '%s'", self._jwks_url)
+                    self._failed_at = now
+                    failed = True
+                else:
+                    self._failed_at = None
+                    fetched = True
+            keys = self._keys
+        # If the JWKS could not be fetched, the key may be one that we don't know yet
+        if failed and (not keys or (key_id is not None and key_id not in keys)):
+            raise JWKSUnavailableError(f"JWKS from '{self._jwks_url}' is unavailable")
+        # If the token does not specify a key, we can only use the key if it is unique
+        if key_id is None and len(keys) == 1:
+            return next(iter(keys.values()))
+        if key_id in keys:
+            return keys[key_id]
+        # A key that is not in the cached set may be a new one that we are not allowed
+        # to fetch yet, e.g. during key rotation, so it is only treated as invalid if
+        # it is missing from a set that we have just fetched
+        if key_id is not None and not fetched:
+            raise JWKSUnavailableError(
+                f"signing key '{key_id}' is not in the cached JWKS and it cannot be "
+                "fetched again yet"
+            )
+        raise jwt.InvalidTokenError(f"signing key '{key_id}' not found in JWKS")
+
+    def validate(self, token):
+        """
+        Validates the signature, expiry, issuer and audience of the token and returns
+        the claims from it.
+
+        Raises ``jwt.ExpiredSignatureError`` if the token has expired,
+        :py:class:`JWKSUnavailableError` if the key for the token cannot be fetched
+        and ``jwt.InvalidTokenError`` if it is not valid for any other reason.
+        """
+        header = jwt.get_unverified_header(token)
+        key = self._signing_key(header.get("kid"))
+        return jwt.decode(
+            token,
+            key.key,
+            algorithms=self._algorithms,
+            audience=self._audience,
+            issuer=self._issuer,
+            options={"require": ["exp", "iss"]},
+        )
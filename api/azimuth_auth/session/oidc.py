@@ -4,13 +4,18 @@ import functools
 import itertools
 import json
 import logging
+import threading
 
 import easykube
 import httpx
+import jwt
 import oauthlib.common
 import oauthlib.oauth2
 
 from . import base, dto, errors
+from .cache import TokenCache
+from .index import CredentialSecretIndex, TenancyNamespaceIndex
+from .jwks import JWKSUnavailableError, JWTValidator
 
 # The labels that indicate a namespace is a tenancy namespace
 # A legacy stackhpc.com label and a new-style azimuth-cloud.io label are both supported
@@ -62,6 +67,78 @@ def convert_httpx_exceptions(f):
     return wrapper
 
 
+class _Refresh:
+    """
+    Represents a refresh of a refresh token that is in progress.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.token_data = None
+
+
+class TokenRefresher:
+    """
+    Coalesces concurrent refreshes of the same refresh token into a single exchange
+    with the token endpoint.
+
+    The first request to need a refresh performs the exchange, and other requests that
+    need to refresh the same refresh token wait for the result. The result is then
+    cached for a short time, so that requests that arrive shortly afterwards with the
+    old refresh token also get the new tokens. This matters for issuers that rotate
+    refresh tokens, where a second exchange of the same refresh token is rejected.
+
+    Args:
+        cache: The token cache to use for the results of refreshes.
+    """
+
+    #: The maximum number of seconds to wait for a refresh in another thread
+    WAIT_TIMEOUT = 30
+
+    def __init__(self, cache=None):
+        self._cache = cache or TokenCache()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def begin(self, refresh_token):
+        """
+        Begins a refresh of the given refresh token.
+
+        Returns a tuple of ``(token_data, leader)``. If ``leader`` is ``True``, the
+        caller must perform the refresh and call :py:meth:`complete` with the result.
+        Otherwise, ``token_data`` is the result of a recent or concurrent refresh,
+        which is ``False`` or ``None`` if that refresh failed.
+        """
+        with self._lock:
+            token_data = self._cache.get(refresh_token, "refresh")
+            if token_data is not None:
+                # A cached value of False means that a recent refresh was rejected
+                return token_data, False
+            refresh = self._in_flight.get(refresh_token)
+            if refresh is None:
+                self._in_flight[refresh_token] = _Refresh()
+                return None, True
+        logger.info("waiting for concurrent refresh of OIDC token")
+        refresh.event.wait(self.WAIT_TIMEOUT)
+        return refresh.token_data, False
+
+    def complete(self, refresh_token, token_data):
+        """
+        Completes a refresh of the given refresh token with the resulting token data,
+        which is ``False`` if the refresh was rejected or ``None`` if it failed for
+        another reason.
+        """
+        with self._lock:
+            if token_data:
+                self._cache.set(refresh_token, token_data, "refresh")
+            elif token_data is False:
+                # Only remember rejections, so that other failures can be retried
+                self._cache.set_invalid(refresh_token, "refresh")
+            refresh = self._in_flight.pop(refresh_token)
+            refresh.token_data = token_data
+        refresh.event.set()
+
+
 class Auth(httpx.Auth):
     """
     Authentication class that consumes the token produced by the OIDC authenticator.
@@ -69,18 +146,23 @@ class Auth(httpx.Auth):
 
     requires_response_body = True
 
-    def __init__(self, token_url, client_id, client_secret, scope, token):
+    def __init__(
+        self, token_url, client_id, client_secret, scope, token, refresher=None
+    ):
         self.token_url = token_url
         self.client_id = client_id
         self.client_secret = client_secret
         self.scope = scope
+        self.refresher = refresher or TokenRefresher()
         self.token = token
-        self.access_token, self.refresh_token = self._parse_token(token)
+        self.access_token, self.refresh_token, self.expires_at = self._parse_token(
+            token
+        )
 
     def _parse_token(self, token):
         """
-        Parse the given token and return an access token and refresh token,
-        if available.
+        Parse the given token and return an access token and the refresh token and
+        expiry timestamp of the access token, if available.
 
         The given token is either a raw access token or a base64-encoded JSON blob
         containing the full token data, as returned by the OIDC authenticator.
@@ -95,7 +177,7 @@ class Auth(httpx.Auth):
                 "failed to parse token as base64-encoded JSON - "
                 "treating as string access token"
             )
-            return token, None
+            return token, None, None
         # If there is no access token in the decoded data, assume the original token is
         # the access token but just happens to be a base64-encoded JSON string :shrugs:
         if "access_token" not in token_data:
@@ -103,12 +185,16 @@ class Auth(httpx.Auth):
                 "access_token not present in token data - "
                 "treating as string access token"
             )
-            return token, None
+            return token, None, None
         # If there is no refresh token in the token data, log that
         if "refresh_token" not in token_data:
             logger.warning("no refresh token present in token data")
-        # Return the access and optional refresh tokens
-        return token_data["access_token"], token_data.get("refresh_token")
+        # Return the access and optional refresh tokens, along with the expiry
+        return (
+            token_data["access_token"],
+            token_data.get("refresh_token"),
+            token_data.get("expires_at"),
+        )
 
     def _refresh_token_request(self):
         client = oauthlib.oauth2.WebApplicationClient(self.client_id)
@@ -132,19 +218,24 @@ class Auth(httpx.Auth):
             },
         )
 
-    def _update_tokens(self, response):
+    def _token_data(self, response):
         # If the refresh response was a client error, log it but don't update the tokens
         if response.is_client_error:
             logger.warning("failed to refresh access token")
-            return
+            return False
         # Raise any non-client errors
         response.raise_for_status()
-        logger.info("extract and store updated tokens")
+        logger.info("extract updated tokens")
         client = oauthlib.oauth2.WebApplicationClient(self.client_id)
         token_data = client.parse_request_body_response(response.text, scope=self.scope)
+        return dict(token_data)
+
+    def _update_tokens(self, token_data):
+        logger.info("store updated tokens")
         self.token = base64.b64encode(json.dumps(token_data).encode()).decode()
         self.access_token = token_data["access_token"]
         self.refresh_token = token_data.get("refresh_token")
+        self.expires_at = token_data.get("expires_at")
 
     def auth_flow(self, request):
         # Add the current access token to the request as a bearer token
@@ -152,9 +243,21 @@ class Auth(httpx.Auth):
         response = yield request
         # Refresh the token and retry the request, if possible
         if self.refresh_token and response.status_code == 401:
-            logger.info("attempting to refresh OIDC token")
-            response = yield self._refresh_token_request()
-            self._update_tokens(response)
+            refresh_token = self.refresh_token
+            # Only one request refreshes each refresh token, and the others reuse the
+            # result
+            token_data, leader = self.refresher.begin(refresh_token)
+            if leader:
+                try:
+                    logger.info("attempting to refresh OIDC token")
+                    response = yield self._refresh_token_request()
+                    token_data = self._token_data(response)
+                finally:
+                    self.refresher.complete(refresh_token, token_data)
+            else:
+                logger.info("using result of concurrent refresh of OIDC token")
+            if token_data:
+                self._update_tokens(token_data)
             logger.info("retrying request with refreshed token")
             request.headers["Authorization"] = f"Bearer {self.access_token}"
             yield request
@@ -163,6 +266,23 @@ class Auth(httpx.Auth):
 class Provider(base.Provider):
     """
     Provider that understands OpenID Connect tokens.
+
+    The userinfo for each access token is cached between requests, keyed by a hash of
+    the access token, for up to ``userinfo_cache_ttl`` seconds but never beyond the
+    expiry of the access token.
+
+    If ``access_token_validation`` is ``jwt``, access tokens are validated locally as
+    JWTs using the keys at ``jwks_url`` and the claims are read from the access token
+    instead of the userinfo endpoint.
+
+    Concurrent refreshes of the same refresh token are coalesced into one exchange
+    with the token endpoint, and the result is cached for ``token_refresh_cache_ttl``
+    seconds for requests that still have the old refresh token.
+
+    If ``tenancy_namespace_index`` is ``True``, the tenancy namespaces are indexed in
+    memory using a Kubernetes watch rather than listed on every request. Similarly, if
+    ``credential_secret_index`` is ``True``, the credential secrets are indexed in
+    memory rather than listed for every tenancy-scoped request.
     """
 
     def __init__(
@@ -177,6 +297,17 @@ class Provider(base.Provider):
         client_secret: str,
         scope: str,
         verify_ssl: bool,
+        cache_alias: str = "default",
+        userinfo_cache_ttl: int = 60,
+        access_token_validation: str = "userinfo",
+        jwks_url: str | None = None,
+        jwks_cache_ttl: int = 3600,
+        access_token_issuer: str | None = None,
+        access_token_audience: str | None = None,
+        access_token_algorithms: list[str] | None = None,
+        token_refresh_cache_ttl: int = 30,
+        tenancy_namespace_index: bool = True,
+        credential_secret_index: bool = True,
     ):
         self.token_url = token_url
         self.userinfo_url = userinfo_url
@@ -188,8 +319,48 @@ class Provider(base.Provider):
         self.client_secret = client_secret
         self.scope = scope
         self.verify_ssl = verify_ssl
+        # The userinfo cache is shared by all the sessions created by this provider
+        self.userinfo_cache = TokenCache(
+            cache_alias, "azimuth_auth.oidc", userinfo_cache_ttl
+        )
+        # Refreshes are coordinated between all the sessions created by this provider
+        self.token_refresher = TokenRefresher(
+            TokenCache(
+                cache_alias,
+                "azimuth_auth.oidc.refresh",
+                token_refresh_cache_ttl,
+                token_refresh_cache_ttl,
+            )
+        )
+        # The JWT validator is also shared, so that the keys are only fetched once
+        if access_token_validation == "jwt":
+            self.jwt_validator = JWTValidator(
+                jwks_url,
+                access_token_issuer,
+                access_token_audience,
+                access_token_algorithms or ["RS256"],
+                verify_ssl,
+                jwks_cache_ttl,
+            )
+        else:
+            self.jwt_validator = None
         # Initialise an easykube client from the environment
         self.ekclient = easykube.Configuration.from_environment().sync_client()
+        # The namespace index is shared by all the sessions created by this provider
+        if tenancy_namespace_index:
+            self.namespace_index = TenancyNamespaceIndex(
+                self.ekclient,
+                [TENANCY_ID_LABEL, TENANCY_ID_LABEL_LEGACY],
+                TENANCY_GROUP_ANNOTATION,
+            )
+        else:
+            self.namespace_index = None
+        if credential_secret_index:
+            self.credential_index = CredentialSecretIndex(
+                self.ekclient, CLOUD_CREDENTIAL_PROVIDER_LABEL
+            )
+        else:
+            self.credential_index = None
 
     def from_token(self, token):
         return Session(
@@ -205,6 +376,11 @@ class Provider(base.Provider):
             self.scope,
             self.verify_ssl,
             token,
+            self.userinfo_cache,
+            self.jwt_validator,
+            self.token_refresher,
+            self.namespace_index,
+            self.credential_index,
         )
 
 
@@ -213,8 +389,9 @@ class Session(base.Session):
     Session implementation that understands OIDC tokens.
 
     In this implementation we do not use the OIDC ID token to identify the user.
-    Instead, we use the OAuth2 access token to query the OIDC userinfo endpoint on every
-    request.
+    Instead, we use the OAuth2 access token to query the OIDC userinfo endpoint. The
+    userinfo is cached for a short time between requests that use the same access
+    token.
 
     This decision was made, at the expense of more requests to the IDP, for a number of
     reasons:
@@ -224,7 +401,12 @@ class Session(base.Session):
         rotated.
       * We don't have to decide how long we are happy working with stale user
         information due to ID token caching. Changes to user information at the IDP, and
-        in particular group memberships, are reflected immediately.
+        in particular group memberships, are reflected as soon as the cached userinfo
+        expires.
+
+    For issuers that issue JWT access tokens containing the required claims, the
+    access token can optionally be validated locally instead, which avoids a request
+    to the IDP for each new access token.
     """
 
     def __init__(
@@ -241,6 +423,11 @@ class Session(base.Session):
         scope: str,
         verify_ssl: bool,
         token: str,
+        userinfo_cache: TokenCache | None = None,
+        jwt_validator: JWTValidator | None = None,
+        token_refresher: TokenRefresher | None = None,
+        namespace_index: TenancyNamespaceIndex | None = None,
+        credential_index: CredentialSecretIndex | None = None,
     ):
         self._ekclient = ekclient
         self._userinfo_url = userinfo_url
@@ -249,11 +436,26 @@ class Session(base.Session):
         self._email_claim = email_claim
         self._groups_claim = groups_claim
         self._verify_ssl = verify_ssl
+        self._userinfo_cache = userinfo_cache or TokenCache()
+        self._jwt_validator = jwt_validator
+        self._namespace_index = namespace_index
+        self._credential_index = credential_index
         # Build the httpx auth object using the parameters
-        self._auth = Auth(token_url, client_id, client_secret, scope, token)
+        self._auth = Auth(
+            token_url, client_id, client_secret, scope, token, token_refresher
+        )
 
     @functools.cached_property
     def _userinfo(self):
+        # Try the userinfo from previous requests with the same access token first
+        userinfo = self._userinfo_cache.get(self._auth.access_token, "userinfo")
+        if userinfo is not None:
+            logger.info("using cached OIDC userinfo")
+            return userinfo
+        if self._jwt_validator:
+            claims = self._validate_access_token()
+            if claims is not None:
+                return claims
         logger.info("fetching OIDC userinfo")
         response = httpx.get(
             self._userinfo_url,
@@ -262,7 +464,40 @@ class Session(base.Session):
             verify=self._verify_ssl,
         )
         response.raise_for_status()
-        return response.json()
+        userinfo = response.json()
+        # The access token may have been refreshed while fetching the userinfo
+        self._userinfo_cache.set(
+            self._auth.access_token,
+            userinfo,
+            "userinfo",
+            expires_at=self._auth.expires_at,
+        )
+        return userinfo
+
+    def _validate_access_token(self):
+        """
+        Validates the access token as a JWT and returns the claims from it.
+
+        If the access token has expired, or the keys required to validate it cannot be
+        fetched, ``None`` is returned so that the userinfo endpoint is used instead,
+        which refreshes the token if possible.
+        """
+        logger.info("validating OIDC access token")
+        try:
+            claims = self._jwt_validator.validate(self._auth.access_token)
+        except jwt.ExpiredSignatureError:
+            logger.info("access token has expired - falling back to userinfo")
+            return None
+        except JWKSUnavailableError:
+            logger.warning("JWKS is unavailable - falling back to userinfo")
+            return None
+        except jwt.PyJWTError:
+            logger.exception("access token is not valid")
+            raise errors.AuthenticationError("Your session has expired.")
+        self._userinfo_cache.set(
+            self._auth.access_token, claims, "userinfo", expires_at=claims["exp"]
+        )
+        return claims
 
     def token(self):
         return self._auth.token
@@ -313,11 +548,47 @@ class Session(base.Session):
             return
         # Search for the tenancy namespaces that the user is permitted to use
         logger.info("[%s] searching for tenancy namespaces", user.username)
-        eknamespaces = self._ekclient.api("v1").resource("namespaces")
-        # Collect the namespaces indexed by ID
         # This is a map of tenancy ID -> a list of namespaces with that ID
         # We do this to avoid non-deterministic behaviour if multiple namespaces have
         # the same ID
+        if self._namespace_index and self._namespace_index.ready():
+            namespaces_by_id = self._namespace_index.namespaces_by_id(user_groups)
+        else:
+            namespaces_by_id = self._list_namespaces_by_id()
+        # Process the indexed namespaces
+        # We require each list to have size one, or we have an error
+        for tenancy_id, namespaces in namespaces_by_id.items():
+            if len(namespaces) != 1:
+                logger.error(
+                    "tenancy ID '%s' appears on multiple namespaces", tenancy_id
+                )
+                continue
+
+            ns_name = namespaces[0]["metadata"]["name"]
+
+            # Allow the tenancy name to come from an annotation, if present
+            # If not, use the tenancy name with the 'az-' prefix removed
+            annotations = namespaces[0]["metadata"].get("annotations", {})
+            tenancy_name = annotations.get(
+                TENANCY_NAME_ANNOTATION, ns_name.removeprefix("az-")
+            )
+
+            # Check if the user has the required group for the tenancy
+            # No annotation means no OIDC users are permitted
+            tenancy_group = annotations.get(TENANCY_GROUP_ANNOTATION)
+            if not tenancy_group:
+                logger.warning("namespace '%s' has no OIDC group annotation", ns_name)
+                continue
+            if tenancy_group not in user_groups:
+                # This is not an exceptional condition so no need to log
+                continue
+
+            # If we get to here, the user is allowed to use the tenancy!
+            yield dto.Tenancy(tenancy_id, tenancy_name)
+
+    def _list_namespaces_by_id(self):
+        # Lists all the tenancy namespaces and returns them indexed by tenancy ID
+        eknamespaces = self._ekclient.api("v1").resource("namespaces")
         namespaces_by_id = {}
         # We de-dupe namespaces that have both labels as we go
         seen_namespaces = set()
@@ -353,39 +624,14 @@ class Session(base.Session):
                 )
             # Store the namespace by ID for further processing
             namespaces_by_id.setdefault(tenancy_id, []).append(ns)
-        # Process the indexed namespaces
-        # We require each list to have size one, or we have an error
-        for tenancy_id, namespaces in namespaces_by_id.items():
-            if len(namespaces) != 1:
-                logger.error(
-                    "tenancy ID '%s' appears on multiple namespaces", tenancy_id
-                )
-                continue
-
-            ns_name = namespaces[0]["metadata"]["name"]
-
-            # Allow the tenancy name to come from an annotation, if present
-            # If not, use the tenancy name with the 'az-' prefix removed
-            annotations = namespaces[0]["metadata"].get("annotations", {})
-            tenancy_name = annotations.get(
-                TENANCY_NAME_ANNOTATION, ns_name.removeprefix("az-")
-            )
-
-            # Check if the user has the required group for the tenancy
-            # No annotation means no OIDC users are permitted
-            tenancy_group = annotations.get(TENANCY_GROUP_ANNOTATION)
-            if not tenancy_group:
-                logger.warning("namespace '%s' has no OIDC group annotation", ns_name)
-                continue
-            if tenancy_group not in user_groups:
-                # This is not an exceptional condition so no need to log
-                continue
-
-            # If we get to here, the user is allowed to use the tenancy!
-            yield dto.Tenancy(tenancy_id, tenancy_name)
+        return namespaces_by_id
 
     def _iter_namespaces(self, tenancy_id):
         # Returns an iterator over the unique tenancy namespaces
+        # Use the index if it is available
+        if self._namespace_index and self._namespace_index.ready():
+            yield from self._namespace_index.namespaces(tenancy_id)
+            return
         # This avoids the second query for the legacy label unless required
         eknamespaces = self._ekclient.api("v1").resource("namespaces")
         seen_namespaces = set()
@@ -441,13 +687,17 @@ class Session(base.Session):
             tenancy_name,
             provider,
         )
-        secrets = list(
-            self._ekclient.api("v1")
-            .resource("secrets")
-            .list(
-                labels={CLOUD_CREDENTIAL_PROVIDER_LABEL: provider}, namespace=namespace
+        if self._credential_index and self._credential_index.ready():
+            secrets = self._credential_index.secrets(namespace, provider)
+        else:
+            secrets = list(
+                self._ekclient.api("v1")
+                .resource("secrets")
+                .list(
+                    labels={CLOUD_CREDENTIAL_PROVIDER_LABEL: provider},
+                    namespace=namespace,
+                )
             )
-        )
         if len(secrets) > 1:
             logger.error(
                 "[%s] [%s] multiple credential secrets found for provider '%s'",
@@ -6,6 +6,7 @@ import yaml
 
 from ..authenticator.openstack import normalize_auth_url  # noqa: TID252
 from . import base, dto, errors
+from .cache import TokenCache
 
 
 def convert_httpx_exceptions(f):
@@ -56,13 +57,40 @@ class OpenStackAuth(httpx.Auth):
 class Provider(base.Provider):
     """
     Provider that understands OpenStack tokens.
+
+    Validated token data is cached between requests, keyed by a hash of the token, for
+    up to ``token_cache_ttl`` seconds but never beyond the expiry of the token. Tokens
+    that fail validation are remembered for ``invalid_token_cache_ttl`` seconds.
+
+    Similarly, project-scoped tokens obtained by rescoping a token are reused for up to
+    ``scoped_token_cache_ttl`` seconds.
     """
 
-    def __init__(self, auth_url, region=None, interface="public", verify_ssl=True):
+    def __init__(
+        self,
+        auth_url,
+        region=None,
+        interface="public",
+        verify_ssl=True,
+        cache_alias="default",
+        token_cache_ttl=300,
+        invalid_token_cache_ttl=5,
+        scoped_token_cache_ttl=3600,
+    ):
         self.auth_url = normalize_auth_url(auth_url)
         self.region = region
         self.interface = interface
         self.verify_ssl = verify_ssl
+        # The token cache is shared by all the sessions created by this provider
+        self.token_cache = TokenCache(
+            cache_alias,
+            "azimuth_auth.openstack",
+            token_cache_ttl,
+            invalid_token_cache_ttl,
+        )
+        self.scoped_token_cache = TokenCache(
+            cache_alias, "azimuth_auth.openstack", scoped_token_cache_ttl
+        )
 
     def from_token(self, token: str) -> "Session":
         return Session(
@@ -75,6 +103,8 @@ class Provider(base.Provider):
             self.region,
             self.interface,
             self.verify_ssl,
+            self.token_cache,
+            self.scoped_token_cache,
         )
 
 
@@ -83,12 +113,23 @@ class Session(base.Session):
     Session for OpenStack clouds.
     """
 
-    def __init__(self, client, auth_url, region, interface, verify_ssl):
+    def __init__(
+        self,
+        client,
+        auth_url,
+        region,
+        interface,
+        verify_ssl,
+        token_cache=None,
+        scoped_token_cache=None,
+    ):
         self.client = client
         self.auth_url = auth_url
         self.region = region
         self.interface = interface
         self.verify_ssl = verify_ssl
+        self.token_cache = token_cache or TokenCache()
+        self.scoped_token_cache = scoped_token_cache or TokenCache()
         # Cached information about the token
         self._token_data = None
 
@@ -97,14 +138,28 @@ class Session(base.Session):
 
     def _get_token_data(self):
         if not self._token_data:
-            response = self.client.get(
-                "/auth/tokens", headers={"X-Subject-Token": self.token()}
-            )
-            # A 401 or a 404 indicates a failure to validate the token
-            if response.status_code in {401, 404}:
+            token = self.token()
+            # Try the cache of token data from previous requests first
+            token_data = self.token_cache.get(token, "token_data")
+            if token_data is False:
                 raise errors.AuthenticationError("Your session has expired.")
-            response.raise_for_status()
-            self._token_data = response.json()["token"]
+            if not token_data:
+                response = self.client.get(
+                    "/auth/tokens", headers={"X-Subject-Token": token}
+                )
+                # A 401 or a 404 indicates a failure to validate the token
+                if response.status_code in {401, 404}:
+                    self.token_cache.set_invalid(token, "token_data")
+                    raise errors.AuthenticationError("Your session has expired.")
+                response.raise_for_status()
+                token_data = response.json()["token"]
+                self.token_cache.set(
+                    token,
+                    token_data,
+                    "token_data",
+                    expires_at=token_data.get("expires_at"),
+                )
+            self._token_data = token_data
         return self._token_data
 
     @convert_httpx_exceptions
@@ -148,6 +203,13 @@ class Session(base.Session):
         token_project_id = token_data.get("project", {}).get("id")
         if token_project_id and (not project_id or token_project_id == project_id):
             return self.token(), token_data
+        # If not, see if we have already rescoped the token for the project
+        # When no project is specified, we reuse the token for whichever project was
+        # picked last time
+        cache_key = project_id or "_default"
+        scoped = self.scoped_token_cache.get(self.token(), "scoped_token", cache_key)
+        if scoped:
+            return scoped
         # If not, attempt to obtain a new token with the correct scope
         # If no project is specified, we use the first project
         if not project_id:
@@ -176,7 +238,15 @@ class Session(base.Session):
             },
         )
         response.raise_for_status()
-        return response.headers["X-Subject-Token"], response.json()["token"]
+        scoped = response.headers["X-Subject-Token"], response.json()["token"]
+        self.scoped_token_cache.set(
+            self.token(),
+            scoped,
+            "scoped_token",
+            cache_key,
+            expires_at=scoped[1].get("expires_at"),
+        )
+        return scoped
 
     def _compute_client(self):
         """
@@ -240,7 +310,7 @@ class Session(base.Session):
         if provider != "openstack":
             return None
         # Get a scoped token for the specified tenancy
-        token, _ = self._scoped_token(tenancy_id)
+        token, token_data = self._scoped_token(tenancy_id)
         # Return the contents of a clouds.yaml configured to use the token
         data = {
             "clouds": {
@@ -258,7 +328,8 @@ class Session(base.Session):
         }
         if self.region:
             data["clouds"]["openstack"]["region_name"] = self.region
-        return dto.Credential(provider, yaml.safe_dump(data))
+        # Pass the token data along so that the token is not validated again
+        return dto.Credential(provider, yaml.safe_dump(data), token_data)
 
     def close(self):
         self.client.close()
@@ -0,0 +1,186 @@
+import queue
+from unittest import TestCase
+
+from .index import CredentialSecretIndex, TenancyNamespaceIndex
+
+ID_LABEL = "tenancy.azimuth-cloud.io/id"
+ID_LABEL_LEGACY = "tenancy.azimuth.stackhpc.com/id"
+GROUP_ANNOTATION = "tenancy.azimuth-cloud.io/oidc-group"
+PROVIDER_LABEL = "credential.azimuth-cloud.io/provider"
+
+
+def make_namespace(name, labels=None, group=None):
+    annotations = {GROUP_ANNOTATION: group} if group else {}
+    return {
+        "metadata": {
+            "name": name,
+            "labels": labels or {},
+            "annotations": annotations,
+        },
+    }
+
+
+def make_secret(namespace, name, provider, resource_version, data=None):
+    return {
+        "metadata": {
+            "namespace": namespace,
+            "name": name,
+            "labels": {PROVIDER_LABEL: provider},
+            "resourceVersion": resource_version,
+        },
+        "data": data or {"cloud": "Y3JlZGVudGlhbA=="},
+    }
+
+
+class FakeResource:
+    """
+    Fake easykube resource whose watch produces events from a queue.
+    """
+
+    def __init__(self, initial_state):
+        self.initial_state = initial_state
+        self.events = queue.Queue()
+
+    def watch_list(self, **params):
+        self.params = params
+
+        def events():
+            while True:
+                event = self.events.get()
+                yield event
+                self.events.task_done()
+
+        return self.initial_state, events()
+
+
+class FakeClient:
+    def __init__(self, resource):
+        self.resource_ = resource
+
+    def api(self, api_version):
+        return self
+
+    def resource(self, name):
+        return self.resource_
+
+
+class WatchIndexTestCase(TestCase):
+    def start_index(self, index):
+        self.assertTrue(index.ready())
+        return index
+
+    def send(self, event_type, obj):
+        self.resource.events.put({"type": event_type, "object": obj})
+        self.resource.events.join()
+
+
+class TenancyNamespaceIndexTestCase(WatchIndexTestCase):
+    def make_index(self, initial_state):
+        self.resource = FakeResource(initial_state)
+        return self.start_index(
+            TenancyNamespaceIndex(
+                FakeClient(self.resource),
+                [ID_LABEL, ID_LABEL_LEGACY],
+                GROUP_ANNOTATION,
+            )
+        )
+
+    def test_initial_state(self):
+        index = self.make_index(
+            [
+                make_namespace("az-one", {ID_LABEL: "one"}, "group-one"),
+                make_namespace("az-two", {ID_LABEL_LEGACY: "two"}, "group-two"),
+                make_namespace("default"),
+            ]
+        )
+        self.assertEqual(
+            [ns["metadata"]["name"] for ns in index.namespaces("one")], ["az-one"]
+        )
+        self.assertEqual(
+            [ns["metadata"]["name"] for ns in index.namespaces("two")], ["az-two"]
+        )
+        self.assertEqual(list(index.namespaces_by_id(["group-two", "other"])), ["two"])
+
+    def test_new_label_takes_precedence(self):
+        index = self.make_index(
+            [make_namespace("az-one", {ID_LABEL: "one", ID_LABEL_LEGACY: "old"})]
+        )
+        self.assertEqual(len(index.namespaces("one")), 1)
+        self.assertEqual(index.namespaces("old"), [])
+
+    def test_duplicate_ids_are_preserved(self):
+        index = self.make_index(
+            [
+                make_namespace("az-one", {ID_LABEL: "one"}, "group"),
+                make_namespace("az-one-again", {ID_LABEL_LEGACY: "one"}),
+            ]
+        )
+        self.assertEqual(len(index.namespaces_by_id(["group"])["one"]), 2)
+
+    def test_events_are_applied(self):
+        index = self.make_index([make_namespace("az-one", {ID_LABEL: "one"}, "a")])
+        # Changing the group moves the tenancy between groups
+        self.send("MODIFIED", make_namespace("az-one", {ID_LABEL: "one"}, "b"))
+        self.assertEqual(index.namespaces_by_id(["a"]), {})
+        self.assertEqual(list(index.namespaces_by_id(["b"])), ["one"])
+        # Adding a new namespace makes it visible
+        self.send("ADDED", make_namespace("az-two", {ID_LABEL: "two"}, "b"))
+        self.assertEqual(set(index.namespaces_by_id(["b"])), {"one", "two"})
+        # Removing the label or deleting the namespace removes it
+        self.send("MODIFIED", make_namespace("az-one", {}, "b"))
+        self.send("DELETED", make_namespace("az-two", {ID_LABEL: "two"}, "b"))
+        self.assertEqual(index.namespaces_by_id(["b"]), {})
+        self.assertEqual(index.namespaces("one"), [])
+
+
+class CredentialSecretIndexTestCase(WatchIndexTestCase):
+    def make_index(self, initial_state):
+        self.resource = FakeResource(initial_state)
+        return self.start_index(
+            CredentialSecretIndex(FakeClient(self.resource), PROVIDER_LABEL)
+        )
+
+    def names(self, secrets):
+        return [secret["metadata"]["name"] for secret in secrets]
+
+    def test_initial_state(self):
+        index = self.make_index(
+            [
+                make_secret("az-one", "openstack", "openstack", "1"),
+                make_secret("az-one", "other", "other", "2"),
+                make_secret("az-two", "openstack", "openstack", "3"),
+            ]
+        )
+        self.assertTrue(self.resource.params["all_namespaces"])
+        self.assertEqual(
+            self.names(index.secrets("az-one", "openstack")), ["openstack"]
+        )
+        self.assertEqual(
+            index.secrets("az-one", "openstack")[0]["data"],
+            {"cloud": "Y3JlZGVudGlhbA=="},
+        )
+        self.assertEqual(self.names(index.secrets("az-two", "other")), [])
+
+    def test_events_are_applied(self):
+        index = self.make_index([make_secret("az-one", "openstack", "openstack", "1")])
+        # Modifying the secret replaces the data
+        self.send(
+            "MODIFIED",
+            make_secret("az-one", "openstack", "openstack", "2", {"cloud": "bmV3"}),
+        )
+        self.assertEqual(
+            index.secrets("az-one", "openstack")[0]["data"], {"cloud": "bmV3"}
+        )
+        # Changing the provider moves the secret
+        self.send("MODIFIED", make_secret("az-one", "openstack", "other", "3"))
+        self.assertEqual(index.secrets("az-one", "openstack"), [])
+        self.assertEqual(self.names(index.secrets("az-one", "other")), ["openstack"])
+        # Deleting the secret removes it
+        self.send("DELETED", make_secret("az-one", "openstack", "other", "4"))
+        self.assertEqual(index.secrets("az-one", "other"), [])
+
+    def test_unchanged_resource_version_is_ignored(self):
+        index = self.make_index([make_secret("az-one", "openstack", "openstack", "1")])
+        secret = index.secrets("az-one", "openstack")[0]
+        self.send("MODIFIED", make_secret("az-one", "openstack", "openstack", "1"))
+        self.assertIs(index.secrets("az-one", "openstack")[0], secret)
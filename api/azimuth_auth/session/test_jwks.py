@@ -0,0 +1,151 @@
+import http.server
+import json
+import threading
+import time
+from unittest import TestCase
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from .jwks import JWKSUnavailableError, JWTValidator
+
+ISSUER = "https://issuer.example.com"
+AUDIENCE = "azimuth"
+
+
+def make_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def make_jwk(private_key, kid):
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return {**jwk, "kid": kid, "use": "sig", "alg": "RS256"}
+
+
+class FakeJWKSHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Request handler for a fake OIDC issuer that serves a JWKS.
+    """
+
+    def do_GET(self):  # noqa: N802
+        self.server.hits += 1
+        if self.server.status != 200:
+            self.send_error(self.server.status)
+            return
+        data = json.dumps({"keys": self.server.keys}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class JWTValidatorTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generating keys is slow, so they are shared by all the tests
+        cls.key = make_key()
+        cls.new_key = make_key()
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeJWKSHandler)
+        self.server.hits = 0
+        self.server.status = 200
+        self.server.keys = [make_jwk(self.key, "key-1")]
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.validator = JWTValidator(
+            f"http://127.0.0.1:{self.server.server_address[1]}/jwks",
+            ISSUER,
+            AUDIENCE,
+            ["RS256"],
+        )
+
+    def make_token(self, key=None, kid="key-1", algorithm="RS256", **claims):
+        claims = {
+            "iss": ISSUER,
+            "aud": AUDIENCE,
+            "sub": "user",
+            "exp": int(time.time()) + 300,
+            **claims,
+        }
+        return jwt.encode(
+            claims, key or self.key, algorithm=algorithm, headers={"kid": kid}
+        )
+
+    def test_valid_token(self):
+        claims = self.validator.validate(self.make_token())
+        self.assertEqual(claims["sub"], "user")
+        # The keys are cached for the next token
+        self.validator.validate(self.make_token())
+        self.assertEqual(self.server.hits, 1)
+
+    def test_wrong_audience(self):
+        with self.assertRaises(jwt.InvalidAudienceError):
+            self.validator.validate(self.make_token(aud="other"))
+
+    def test_wrong_issuer(self):
+        with self.assertRaises(jwt.InvalidIssuerError):
+            self.validator.validate(self.make_token(iss="https://other.example.com"))
+
+    def test_expired_token(self):
+        with self.assertRaises(jwt.ExpiredSignatureError):
+            self.validator.validate(self.make_token(exp=int(time.time()) - 60))
+
+    def test_algorithm_not_allowed(self):
+        token = self.make_token(
+            key="a-shared-secret-of-at-least-32-bytes", algorithm="HS256"
+        )
+        with self.assertRaises(jwt.InvalidAlgorithmError):
+            self.validator.validate(token)
+
+    def test_unknown_key_is_fetched(self):
+        self.validator.validate(self.make_token())
+        # Rotate the keys at the issuer
+        self.server.keys.append(make_jwk(self.new_key, "key-2"))
+        self.validator.MIN_REFRESH_INTERVAL = 0
+        claims = self.validator.validate(self.make_token(self.new_key, "key-2"))
+        self.assertEqual(claims["sub"], "user")
+        self.assertEqual(self.server.hits, 2)
+
+    def test_unknown_key_fetch_is_rate_limited(self):
+        self.validator.validate(self.make_token())
+        self.server.keys.append(make_jwk(self.new_key, "key-2"))
+        # The new key can't be fetched yet, so the caller should fall back
+        for _ in range(3):
+            with self.assertRaises(JWKSUnavailableError):
+                self.validator.validate(self.make_token(self.new_key, "key-2"))
+        self.assertEqual(self.server.hits, 1)
+
+    def test_key_missing_from_fetched_jwks(self):
+        # A key that is not in the JWKS we have just fetched is invalid
+        with self.assertRaises(jwt.InvalidTokenError):
+            self.validator.validate(self.make_token(self.new_key, "key-2"))
+
+    def test_failed_fetch_backs_off(self):
+        self.server.status = 500
+        for _ in range(3):
+            with self.assertRaises(JWKSUnavailableError):
+                self.validator.validate(self.make_token())
+        self.assertEqual(self.server.hits, 1)
+        # Once the backoff has expired, the JWKS is fetched again
+        self.server.status = 200
+        self.validator.FAILURE_BACKOFF = 0
+        self.assertEqual(self.validator.validate(self.make_token())["sub"], "user")
+        self.assertEqual(self.server.hits, 2)
+
+    def test_cached_keys_are_used_when_fetch_fails(self):
+        self.validator.validate(self.make_token())
+        self.server.status = 500
+        self.validator._jwks_cache_ttl = 0
+        self.assertEqual(self.validator.validate(self.make_token())["sub"], "user")
+        self.assertEqual(self.server.hits, 2)
+        # The key rotation can't be picked up until the issuer is available again
+        with self.assertRaises(JWKSUnavailableError):
+            self.validator.validate(self.make_token(self.new_key, "key-2"))
+        self.assertEqual(self.server.hits, 2)
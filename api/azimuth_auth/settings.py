@@ -89,6 +89,45 @@ class OIDCSettings(SettingsObject):
     #: Indicates whether to verify SSL for the OIDC issuer
     VERIFY_SSL = Setting(default=True)
 
+    #: The maximum number of seconds to cache the userinfo for an access token for
+    #: Userinfo is never cached beyond the expiry of the access token
+    #: Use 0 to fetch the userinfo on every request
+    USERINFO_CACHE_TTL = Setting(default=60)
+    #: The number of seconds to cache the result of refreshing a refresh token for
+    #: This allows requests that still have the old refresh token to use the new tokens
+    TOKEN_REFRESH_CACHE_TTL = Setting(default=30)
+    #: Indicates whether to index the tenancy namespaces using a Kubernetes watch
+    #: If not, the tenancy namespaces are listed on every request
+    TENANCY_NAMESPACE_INDEX = Setting(default=True)
+    #: Indicates whether to index the credential secrets using a Kubernetes watch
+    #: If not, the credential secrets are listed for every tenancy-scoped request
+    CREDENTIAL_SECRET_INDEX = Setting(default=True)
+
+    #: How access tokens are validated and the user's claims are obtained
+    #: "userinfo" uses the userinfo endpoint of the issuer, which accepts any access
+    #: token
+    #: "jwt" validates JWT access tokens locally using the keys from the issuer, and
+    #: reads the claims from the access token, which must then contain the username,
+    #: email and groups claims
+    ACCESS_TOKEN_VALIDATION = ChoiceSetting(["userinfo", "jwt"], default="userinfo")
+    #: The issuer that JWT access tokens must have
+    #: If not given, OIDC discovery is used to discover it
+    ACCESS_TOKEN_ISSUER = OIDCDiscoverySetting("issuer")
+    #: The audience that JWT access tokens must have
+    #: If not given, the client ID is used
+    ACCESS_TOKEN_AUDIENCE = Setting(default=None)
+    #: The algorithms that are permitted for signing JWT access tokens
+    ACCESS_TOKEN_ALGORITHMS = Setting(
+        default=("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+    )
+    #: The URL of the keys used to validate JWT access tokens
+    #: If not given, OIDC discovery is used to discover it
+    JWKS_URL = OIDCDiscoverySetting("jwks_uri")
+    #: The maximum number of seconds to cache the keys used to validate JWT access
+    #: tokens for
+    #: The keys are also fetched again when a token uses a key that is not known
+    JWKS_CACHE_TTL = Setting(default=3600)
+
     @functools.cached_property
     def DISCOVERY_DATA(self):  # noqa: N802
         """
@@ -129,6 +168,15 @@ class OpenStackSettings(SettingsObject):
     #: The federated identity providers
     FEDERATED_IDENTITY_PROVIDERS = Setting(default=list)
 
+    #: The maximum number of seconds to cache validated token data for
+    #: Token data is never cached beyond the expiry of the token
+    TOKEN_CACHE_TTL = Setting(default=300)
+    #: The number of seconds to remember that a token is invalid for
+    INVALID_TOKEN_CACHE_TTL = Setting(default=5)
+    #: The maximum number of seconds to reuse a project-scoped token for
+    #: Scoped tokens are never reused beyond their expiry
+    SCOPED_TOKEN_CACHE_TTL = Setting(default=3600)
+
 
 class AuthenticatorsSetting(ObjectFactorySetting):
     """
@@ -231,6 +279,19 @@ class SessionProviderSetting(ObjectFactorySetting):
 
     def _get_default(self, instance):
         if instance.AUTH_TYPE == "oidc":
+            # Only use discovery for the JWT settings if they are required
+            if instance.OIDC.ACCESS_TOKEN_VALIDATION == "jwt":
+                jwt_params = {
+                    "JWKS_URL": instance.OIDC.JWKS_URL,
+                    "JWKS_CACHE_TTL": instance.OIDC.JWKS_CACHE_TTL,
+                    "ACCESS_TOKEN_ISSUER": instance.OIDC.ACCESS_TOKEN_ISSUER,
+                    "ACCESS_TOKEN_AUDIENCE": (
+                        instance.OIDC.ACCESS_TOKEN_AUDIENCE or instance.OIDC.CLIENT_ID
+                    ),
+                    "ACCESS_TOKEN_ALGORITHMS": instance.OIDC.ACCESS_TOKEN_ALGORITHMS,
+                }
+            else:
+                jwt_params = {}
             return {
                 "FACTORY": "azimuth_auth.session.oidc.Provider",
                 "PARAMS": {
@@ -244,6 +305,13 @@ class SessionProviderSetting(ObjectFactorySetting):
                     "CLIENT_SECRET": instance.OIDC.CLIENT_SECRET,
                     "SCOPE": instance.OIDC.SCOPE,
                     "VERIFY_SSL": instance.OIDC.VERIFY_SSL,
+                    "CACHE_ALIAS": instance.CACHE_ALIAS,
+                    "USERINFO_CACHE_TTL": instance.OIDC.USERINFO_CACHE_TTL,
+                    "TOKEN_REFRESH_CACHE_TTL": instance.OIDC.TOKEN_REFRESH_CACHE_TTL,
+                    "TENANCY_NAMESPACE_INDEX": instance.OIDC.TENANCY_NAMESPACE_INDEX,
+                    "CREDENTIAL_SECRET_INDEX": instance.OIDC.CREDENTIAL_SECRET_INDEX,
+                    "ACCESS_TOKEN_VALIDATION": instance.OIDC.ACCESS_TOKEN_VALIDATION,
+                    **jwt_params,
                 },
             }
         elif instance.AUTH_TYPE == "openstack":
@@ -254,6 +322,14 @@ class SessionProviderSetting(ObjectFactorySetting):
                     "REGION": instance.OPENSTACK.REGION,
                     "INTERFACE": instance.OPENSTACK.INTERFACE,
                     "VERIFY_SSL": instance.OPENSTACK.VERIFY_SSL,
+                    "CACHE_ALIAS": instance.CACHE_ALIAS,
+                    "TOKEN_CACHE_TTL": instance.OPENSTACK.TOKEN_CACHE_TTL,
+                    "INVALID_TOKEN_CACHE_TTL": (
+                        instance.OPENSTACK.INVALID_TOKEN_CACHE_TTL
+                    ),
+                    "SCOPED_TOKEN_CACHE_TTL": (
+                        instance.OPENSTACK.SCOPED_TOKEN_CACHE_TTL
+                    ),
                 },
             }
         else:
@@ -278,6 +354,10 @@ class AzimuthAuthSettings(SettingsObject):
     #: The session provider to use
     SESSION_PROVIDER = SessionProviderSetting()
 
+    #: The alias of the Django cache used to cache data between requests
+    #: By default, this is a cache that is local to each process
+    CACHE_ALIAS = Setting(default="default")
+
     #: The HTTP parameter to pass the selected option to the start URL
     SELECTED_OPTION_PARAM = Setting(default="option")
     #: The session key used to preserve the selected option across redirections
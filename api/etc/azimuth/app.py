@@ -57,3 +57,16 @@ CSRF_COOKIE_HTTPONLY = False
 # Use cookie names that don't conflict by default
 CSRF_COOKIE_NAME = "azimuth-csrftoken"
 SESSION_COOKIE_NAME = "azimuth-sessionid"
+
+# Use a process-local cache by default
+# This is used to cache slowly-changing data from the cloud between requests, and can
+# be replaced with a cache that is shared between processes, e.g. Redis, if required
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "azimuth",
+        "OPTIONS": {
+            "MAX_ENTRIES": 10000,
+        },
+    },
+}
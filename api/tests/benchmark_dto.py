@@ -0,0 +1,147 @@
+"""
+Benchmarks for the memory use and construction time of the DTOs.
+
+Each DTO is compared with an equivalent frozen dataclass that does not use slots,
+for listings of 10,000 objects. All the objects share the same field values, so
+the memory figures show the overhead of the objects themselves.
+
+Run from the ``api`` directory using ``python -m tests.benchmark_dto``.
+"""
+
+import dataclasses
+import datetime
+import timeit
+import tracemalloc
+
+from azimuth.cluster_api import dto as capi_dto
+from azimuth.cluster_engine import dto as caas_dto
+from azimuth.provider import dto
+
+#: The number of objects in each listing
+COUNT = 10_000
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+#: The DTO classes to benchmark, with the field values to use
+BENCHMARKS = [
+    (
+        dto.Machine,
+        dict(
+            id="5e0b3b6c-0a0e-4c4e-9d4c-0d1a0e3b5a1f",
+            name="machine",
+            image_id="image",
+            size_id="size",
+            status=dto.MachineStatus(dto.MachineStatusType.ACTIVE, "ACTIVE", None),
+            power_state="Running",
+            task=None,
+            internal_ip="192.168.3.10",
+            external_ip=None,
+            attached_volume_ids=(),
+            metadata={},
+            owner="user",
+            created=NOW,
+        ),
+    ),
+    (
+        dto.Image,
+        dict(id="image", name="image", is_public=True, size=1024.0, metadata={}),
+    ),
+    (
+        dto.Volume,
+        dict(
+            id="volume",
+            name="volume",
+            status=dto.VolumeStatus.AVAILABLE,
+            size=10,
+            machine_id=None,
+            device=None,
+        ),
+    ),
+    (
+        capi_dto.Node,
+        dict(
+            name="node",
+            role="worker",
+            status="Ready",
+            size_id="size",
+            ip="192.168.3.10",
+            kubelet_version="v1.30.0",
+            node_group="md-0",
+            created_at=NOW,
+        ),
+    ),
+    (
+        caas_dto.Cluster,
+        dict(
+            id="cluster",
+            name="cluster",
+            cluster_type="workstation",
+            cluster_type_version="1",
+            status=caas_dto.ClusterStatus.READY,
+            task=None,
+            error_message=None,
+            parameter_values={},
+            tags=[],
+            outputs={},
+            created=NOW,
+            updated=NOW,
+            patched=NOW,
+            created_by_username=None,
+            created_by_user_id=None,
+            updated_by_username=None,
+            updated_by_user_id=None,
+            services=[],
+            schedule=None,
+            raw_parameter_values={},
+        ),
+    ),
+]
+
+
+def unslotted(dto_class):
+    """
+    Returns an equivalent frozen dataclass for the DTO class that does not use slots.
+    """
+    return dataclasses.make_dataclass(
+        dto_class.__name__,
+        [(f.name, f.type) for f in dataclasses.fields(dto_class)],
+        frozen=True,
+    )
+
+
+def memory_per_object(dto_class, kwargs):
+    """
+    Returns the number of bytes allocated per object when building a listing.
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = tuple(dto_class(**kwargs) for _ in range(COUNT))
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return (after - before) / COUNT
+
+
+def construction_time(dto_class, kwargs):
+    """
+    Returns the best time in milliseconds taken to build a listing.
+    """
+    timer = timeit.Timer(lambda: tuple(dto_class(**kwargs) for _ in range(COUNT)))
+    return min(timer.repeat(repeat=5, number=1)) * 1000
+
+
+def main():
+    print(f"{'DTO':<12} {'variant':<10} {'bytes/object':>14} {'ms/listing':>12}")
+    for dto_class, kwargs in BENCHMARKS:
+        for variant, cls in [("dict", unslotted(dto_class)), ("slots", dto_class)]:
+            print(
+                f"{dto_class.__name__:<12} {variant:<10} "
+                f"{memory_per_object(cls, kwargs):>14.1f} "
+                f"{construction_time(cls, kwargs):>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
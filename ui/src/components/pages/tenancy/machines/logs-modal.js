@@ -72,7 +72,11 @@ export const MachineLogsMenuItem = ({ machine, machineActions, ...props }) => {
             // If transitioning into a fetching state, or not following, there is nothing to do
             if( !following || machine.fetchingLogs ) return;
             // If transitioning to a non-fetching state, set a timeout to fetch the logs again
-            const timerId = setTimeout(() => machineActions.fetchLogs(), 3000);
+            // Only the lines since the last fetch are fetched
+            const timerId = setTimeout(
+                () => machineActions.fetchLogs(machine.logsOffset),
+                3000
+            );
             return () => clearTimeout(timerId);
         },
         [following, machine.fetchingLogs]
@@ -144,7 +148,7 @@ export const MachineLogsMenuItem = ({ machine, machineActions, ...props }) => {
                             <Button
                                 variant="primary"
                                 disabled={machine.fetchingLogs}
-                                onClick={machineActions.fetchLogs}
+                                onClick={() => machineActions.fetchLogs()}
                             >
                                 <FontAwesomeIcon
                                     icon={faSyncAlt}
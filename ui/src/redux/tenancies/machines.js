@@ -66,17 +66,22 @@ export const actions = {
 export const actionCreators = {
     ...resourceActionCreators,
 
-    fetchLogs: (tenancyId, machineId) => ({
+    // If an offset from a previous fetch is given, only the new lines are fetched
+    fetchLogs: (tenancyId, machineId, offset) => ({
         type: actions.FETCH_LOGS,
         tenancyId,
         machineId,
+        offset,
         apiRequest: true,
         // All errors are reported via the modal UI
         failSilently: true,
         successAction: actions.FETCH_LOGS_SUCCEEDED,
         failureAction: actions.FETCH_LOGS_FAILED,
         options: {
-            url: `/api/tenancies/${tenancyId}/machines/${machineId}/logs/`,
+            url: (
+                `/api/tenancies/${tenancyId}/machines/${machineId}/logs/` +
+                (offset !== undefined ? `?offset=${offset}` : '')
+            ),
             method: 'GET'
         }
     }),
@@ -190,7 +195,18 @@ export function reducer(state, action) {
                             state,
                             action.request.machineId,
                             {
-                                logs: action.payload.logs,
+                                // Unless the server says otherwise, the lines from an
+                                // incremental fetch follow on from the existing lines
+                                logs: (
+                                    action.request.offset !== undefined &&
+                                    !action.payload.reset
+                                ) ?
+                                    [
+                                        ...(state.data[action.request.machineId].logs || []),
+                                        ...action.payload.logs
+                                    ] :
+                                    action.payload.logs,
+                                logsOffset: action.payload.offset,
                                 fetchingLogs: false,
                                 fetchLogsError: undefined
                             }